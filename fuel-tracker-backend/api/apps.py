@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # LOGGING is already configured here, move its handler I/O off request threads
+        from fuel_tracker.log_queue import start_queued_logging
+        start_queued_logging(settings.LOGGING.get('loggers', {}).keys())
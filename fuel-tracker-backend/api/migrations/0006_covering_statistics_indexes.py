@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_recalculate_existing_metrics'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='fuelentry',
+            name='api_fuelent_user_id_f02835_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='fuelentry',
+            name='api_fuelent_user_id_9e0131_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='fuelentry',
+            name='api_fuelent_vehicle_a085c5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='fuelentry',
+            name='api_fuelent_vehicle_561c75_idx',
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['user', 'fuel_brand'], include=['liters', 'total_amount', 'distance_since_last'], name='fe_user_brand_stats_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['user', 'fuel_grade'], include=['liters', 'total_amount', 'distance_since_last'], name='fe_user_grade_stats_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['vehicle', 'fuel_brand'], include=['liters', 'total_amount', 'distance_since_last'], name='fe_vehicle_brand_stats_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['vehicle', 'fuel_grade'], include=['liters', 'total_amount', 'distance_since_last'], name='fe_vehicle_grade_stats_idx'),
+        ),
+    ]
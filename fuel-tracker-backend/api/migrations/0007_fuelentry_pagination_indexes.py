@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-15 12:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_covering_statistics_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='fuelentry',
+            name='api_fuelent_user_id_24c686_idx',
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['user', '-entry_date', '-odometer'], name='api_fuelent_user_id_8ad98c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['user', 'odometer'], name='api_fuelent_user_id_037f99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['user', 'total_amount', 'odometer'], name='api_fuelent_user_id_95985b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=models.Index(fields=['user', 'created_at', 'odometer'], name='api_fuelent_user_id_987ef4_idx'),
+        ),
+    ]
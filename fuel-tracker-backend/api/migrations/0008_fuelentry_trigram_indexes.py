@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-15 13:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_fuelentry_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('fuel_brand'), name='gin_trgm_ops'), name='fe_fuel_brand_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('fuel_grade'), name='gin_trgm_ops'), name='fe_fuel_grade_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelentry',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('station_name'), name='gin_trgm_ops'), name='fe_station_name_trgm_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 
 
@@ -82,7 +84,12 @@ class FuelEntry(models.Model):
         unique_together = ('vehicle', 'entry_date', 'odometer')
         indexes = [
             # For filtering by user and sorting by date
-            models.Index(fields=['user', '-entry_date']),
+            # (matches default cursor pagination ordering)
+            models.Index(fields=['user', '-entry_date', '-odometer']),
+            # For the other cursor pagination sort options
+            models.Index(fields=['user', 'odometer']),
+            models.Index(fields=['user', 'total_amount', 'odometer']),
+            models.Index(fields=['user', 'created_at', 'odometer']),
             # For filtering by vehicle and sorting by date
             models.Index(fields=['vehicle', '-entry_date']),
             # For checking the monotonicity of the odometer
@@ -93,14 +100,33 @@ class FuelEntry(models.Model):
             models.Index(fields=['vehicle', 'entry_date']),
             # For metric aggregates (excluding NULL values)
             models.Index(fields=['user', 'entry_date', 'consumption_l_100km']),
-            # For statistics by brand (user + brand + metrics)
-            models.Index(fields=['user', 'fuel_brand', 'consumption_l_100km']),
-            # For statistics by grade (user + grade + metrics)
-            models.Index(fields=['user', 'fuel_grade', 'consumption_l_100km']),
-            # For statistics by brand for a specific vehicle
-            models.Index(fields=['vehicle', 'fuel_brand', 'consumption_l_100km']),
-            # For statistics by grade for a specific vehicle
-            models.Index(fields=['vehicle', 'fuel_grade', 'consumption_l_100km']),
+            # Covering indexes for brand/grade statistics: grouping and summed
+            # columns are all in the index, so aggregates use index-only scans
+            models.Index(
+                fields=['user', 'fuel_brand'],
+                include=['liters', 'total_amount', 'distance_since_last'],
+                name='fe_user_brand_stats_idx',
+            ),
+            models.Index(
+                fields=['user', 'fuel_grade'],
+                include=['liters', 'total_amount', 'distance_since_last'],
+                name='fe_user_grade_stats_idx',
+            ),
+            models.Index(
+                fields=['vehicle', 'fuel_brand'],
+                include=['liters', 'total_amount', 'distance_since_last'],
+                name='fe_vehicle_brand_stats_idx',
+            ),
+            models.Index(
+                fields=['vehicle', 'fuel_grade'],
+                include=['liters', 'total_amount', 'distance_since_last'],
+                name='fe_vehicle_grade_stats_idx',
+            ),
+            # Trigram indexes for icontains list filters, which PostgreSQL
+            # gets as UPPER(col::text) LIKE UPPER('%q%'), so UPPER(col) is indexed
+            GinIndex(OpClass(Upper('fuel_brand'), name='gin_trgm_ops'), name='fe_fuel_brand_trgm_idx'),
+            GinIndex(OpClass(Upper('fuel_grade'), name='gin_trgm_ops'), name='fe_fuel_grade_trgm_idx'),
+            GinIndex(OpClass(Upper('station_name'), name='gin_trgm_ops'), name='fe_station_name_trgm_idx'),
         ]
 
     def __str__(self):
@@ -4,12 +4,13 @@ from rest_framework import permissions
 class IsOwner(permissions.BasePermission):
     """
     Custom permission: access only to the owner of the object.
-    Checks that obj.user == request.user
+    Checks that obj.user_id == request.user.id
     """
 
     def has_object_permission(self, request, view, obj):
         """
         Object-level check: user can only access their own objects (Vehicle, FuelEntry)
+        Compare by id so the related user is not loaded for every object.
         """
-        return obj.user == request.user
+        return obj.user_id == request.user.id
 
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.utils import timezone
 import bleach
 from .models import Vehicle, FuelEntry
-from .services import FuelEntryMetricsService
+from .services import FuelEntryMetricsService, StatisticsService
 
 
 def sanitize_text_input(value):
@@ -74,6 +74,49 @@ class GradeStatisticsSerializer(serializers.Serializer):
     fill_count = serializers.IntegerField()
 
 
+class CombinedStatisticsSerializer(serializers.Serializer):
+    """Serializer for combined dashboard, brand and grade statistics"""
+    dashboard = DashboardStatisticsResponseSerializer()
+    brands = BrandStatisticsSerializer(many=True)
+    grades = GradeStatisticsSerializer(many=True)
+
+
+class StatisticsQuerySerializer(serializers.Serializer):
+    """Query parameters shared by statistics endpoints"""
+    vehicle = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+
+
+class DashboardStatisticsQuerySerializer(StatisticsQuerySerializer):
+    """
+    Query parameters of dashboard statistics endpoint.
+
+    Validation:
+    - Custom period requires date_after and date_before, in that order
+    - Custom period cannot exceed 365 days (DoS protection via large periods)
+    """
+    period = serializers.ChoiceField(choices=['30d', '90d', 'ytd', 'custom'], default='30d')
+    date_after = serializers.DateField(required=False, allow_null=True)
+    date_before = serializers.DateField(required=False, allow_null=True)
+
+    def validate(self, data):
+        if data['period'] == 'custom':
+            date_after = data.get('date_after')
+            date_before = data.get('date_before')
+            if not date_after or not date_before:
+                raise serializers.ValidationError(
+                    "Custom period requires date_after and date_before parameters."
+                )
+            if date_after > date_before:
+                raise serializers.ValidationError(
+                    "date_after cannot be later than date_before."
+                )
+            if (date_before - date_after).days > 365:
+                raise serializers.ValidationError(
+                    "Custom period cannot exceed 365 days."
+                )
+        return data
+
+
 class VehicleSerializer(serializers.ModelSerializer):
     """Serializer for Vehicle model"""
     
@@ -144,9 +187,7 @@ class VehicleSerializer(serializers.ModelSerializer):
 
             # Invalidate statistics cache for this user
             # This ensures dashboard shows updated data
-            from django.core.cache import cache
-            from django.utils import timezone
-            cache.set(f'stats_version_user_{instance.user_id}', timezone.now().timestamp())
+            StatisticsService.invalidate_cache(instance.user_id)
 
         return instance
 
@@ -161,12 +202,13 @@ class FuelEntrySerializer(serializers.ModelSerializer):
     - Liters and total_amount must be > 0
     - XSS sanitization of all text fields
     """
-    vehicle_id = serializers.IntegerField(source='vehicle.id', read_only=True)
+    # Read FK columns directly so related objects are not loaded per row
+    vehicle_id = serializers.IntegerField(read_only=True)
     vehicle = serializers.PrimaryKeyRelatedField(
         queryset=Vehicle.objects.all(),
         write_only=True
     )
-    user_id = serializers.IntegerField(source='user.id', read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
     
     # Explicit validation of text fields
     station_name = serializers.CharField(max_length=100, trim_whitespace=True)
@@ -5,7 +5,8 @@ Encapsulates metrics calculation and cascade recalculation logic.
 from decimal import Decimal
 from typing import Optional, Dict, List, Any
 from datetime import date, timedelta
-from django.db import transaction
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.db.models import Avg, Sum, Count, Min, Max, Q
 from django.utils import timezone
 from .models import FuelEntry, Vehicle
@@ -27,7 +28,7 @@ class FuelEntryMetricsService:
         Calculate metrics for fuel entry.
         
         Args:
-            fuel_entry: Fuel entry (must be saved to DB)
+            fuel_entry: Fuel entry (may be unsaved, or hold changes not saved yet)
             previous_entry: previous entry (optional). If not provided, will query DB.
         """
         # unit_price is always calculated
@@ -39,12 +40,16 @@ class FuelEntryMetricsService:
             # Find previous entry considering:
             # 1. Entries on earlier dates
             # 2. Entries on same date with lower odometer
-            previous_entry = FuelEntry.objects.filter(
+            # 3. Not the entry itself (its stored row may still hold old values)
+            previous_entries = FuelEntry.objects.filter(
                 vehicle=fuel_entry.vehicle
             ).filter(
                 Q(entry_date__lt=fuel_entry.entry_date) |
                 Q(entry_date=fuel_entry.entry_date, odometer__lt=fuel_entry.odometer)
-            ).order_by('-entry_date', '-odometer').first()
+            )
+            if fuel_entry.pk:
+                previous_entries = previous_entries.exclude(pk=fuel_entry.pk)
+            previous_entry = previous_entries.order_by('-entry_date', '-odometer').first()
 
         # For the first entry, calculate distance from the vehicle's initial odometer.
         # For subsequent entries, calculate from the previous entry's odometer.
@@ -121,6 +126,7 @@ class FuelEntryMetricsService:
     def recalculate_metrics_after_entry(fuel_entry: FuelEntry) -> int:
         """
         Cascade metrics recalculation for all entries after specified.
+        Performs 1 SELECT for entries and 1 bulk_update.
         
         Args:
             fuel_entry: Entry after which to recalculate
@@ -128,24 +134,32 @@ class FuelEntryMetricsService:
         Returns:
             Number of recalculated entries
         """
-        # Get all entries after current
-        entries_to_recalculate = FuelEntry.objects.filter(
-            vehicle=fuel_entry.vehicle,
-            entry_date__gt=fuel_entry.entry_date
-        ).order_by('entry_date', 'created_at')
+        # Get all entries after current, in the same order
+        # calculate_metrics uses to find the previous entry
+        entries = list(FuelEntry.objects.filter(
+            vehicle_id=fuel_entry.vehicle_id
+        ).filter(
+            Q(entry_date__gt=fuel_entry.entry_date) |
+            Q(entry_date=fuel_entry.entry_date, odometer__gt=fuel_entry.odometer)
+        ).order_by('entry_date', 'odometer'))
         
-        count = 0
-        for entry in entries_to_recalculate:
-            FuelEntryMetricsService.calculate_metrics(entry)
-            entry.save(update_fields=[
-                'unit_price', 
-                'distance_since_last', 
-                'consumption_l_100km', 
-                'cost_per_km'
-            ])
-            count += 1
+        if not entries:
+            return 0
+        
+        # Calculate metrics in memory, chaining each entry to the previous one
+        previous_entry = fuel_entry
+        for entry in entries:
+            FuelEntryMetricsService.calculate_metrics(entry, previous_entry)
+            previous_entry = entry
         
-        return count
+        # One bulk_update to save all changes
+        FuelEntry.objects.bulk_update(
+            entries,
+            ['unit_price', 'distance_since_last', 'consumption_l_100km', 'cost_per_km'],
+            batch_size=500
+        )
+        
+        return len(entries)
     
     @staticmethod
     @transaction.atomic
@@ -153,7 +167,9 @@ class FuelEntryMetricsService:
         """
         Optimized full metrics recalculation for all vehicle entries.
         Used after entry deletion or changing initial_odometer.
-        Performs 1 SELECT for entries and 1 bulk_update.
+        Performs a single UPDATE: previous odometer is taken with LAG() over
+        the same (entry_date, odometer) ordering used by calculate_metrics and
+        recalculate_metrics_after_entry (id only breaks exact ties).
         
         Args:
             vehicle_id: Vehicle ID
@@ -163,38 +179,42 @@ class FuelEntryMetricsService:
         Returns:
             Number of updated entries
         """
-        # Fetch entries
-        entries = list(FuelEntry.objects.filter(
-            vehicle_id=vehicle_id
-        ).order_by('entry_date', 'created_at'))
-
-        if not entries:
-            return 0
-
-        # If an updated vehicle instance is not passed, fetch it.
-        # Otherwise, attach the passed (and updated) instance to each entry.
-        if vehicle_instance is None:
-            try:
-                vehicle_instance = Vehicle.objects.get(id=vehicle_id)
-            except Vehicle.DoesNotExist:
-                return 0  # Should not happen if entries exist
-
-        # Ensure all entries use the same, correct vehicle instance for calculation
-        for entry in entries:
-            entry.vehicle = vehicle_instance
-
-        # 2. Calculate metrics in memory
-        previous_entry = None
-        for entry in entries:
-            # Pass previous_entry to avoid N+1 queries
-            FuelEntryMetricsService.calculate_metrics(entry, previous_entry)
-            previous_entry = entry
-
-        # 3. One bulk_update to save all changes
-        update_fields = ['unit_price', 'distance_since_last', 'consumption_l_100km', 'cost_per_km']
-        FuelEntry.objects.bulk_update(entries, update_fields)
-
-        return len(entries)
+        if vehicle_instance is not None:
+            initial_odometer = vehicle_instance.initial_odometer
+        else:
+            initial_odometer = Vehicle.objects.filter(id=vehicle_id).values_list(
+                'initial_odometer', flat=True
+            ).first()
+            if initial_odometer is None:
+                return 0
+
+        table = connection.ops.quote_name(FuelEntry._meta.db_table)
+        sql = f"""
+            WITH ordered AS (
+                SELECT
+                    id,
+                    odometer - COALESCE(
+                        LAG(odometer) OVER (ORDER BY entry_date, odometer, id),
+                        %s
+                    ) AS distance
+                FROM {table}
+                WHERE vehicle_id = %s
+            )
+            UPDATE {table} AS fe SET
+                unit_price = fe.total_amount / fe.liters,
+                distance_since_last = ordered.distance,
+                consumption_l_100km = CASE
+                    WHEN ordered.distance > 0 THEN fe.liters * 100 / ordered.distance
+                END,
+                cost_per_km = CASE
+                    WHEN ordered.distance > 0 THEN fe.total_amount / ordered.distance
+                END
+            FROM ordered
+            WHERE fe.id = ordered.id
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [initial_odometer, vehicle_id])
+            return cursor.rowcount
 
 
 class StatisticsService:
@@ -208,6 +228,24 @@ class StatisticsService:
     - custom: custom period (date_after, date_before)
     """
     
+    @staticmethod
+    def invalidate_cache(user_id: int) -> None:
+        """
+        Invalidate statistics cache for user by incrementing version key.
+        
+        The version is bumped only after the current transaction commits.
+        Bumping it earlier lets a concurrent request cache statistics built
+        from the old rows under the new version, leaving them stale.
+        """
+        version_key = f'stats_version_user_{user_id}'
+
+        def bump_version():
+            # A missing key reads as version 1, so create it before incrementing
+            cache.add(version_key, 1, timeout=None)
+            cache.incr(version_key)
+
+        transaction.on_commit(bump_version)
+    
     @staticmethod
     def get_period_dates(period_type: str, date_after: Optional[date] = None, date_before: Optional[date] = None) -> Dict[str, date]:
         """
@@ -291,6 +329,8 @@ class StatisticsService:
             entry_count=Count('id'),
             min_consumption=Min('consumption_l_100km'),
             max_consumption=Max('consumption_l_100km'),
+            first_entry_date=Min('entry_date'),
+            last_entry_date=Max('entry_date'),
         )
 
         total_distance = aggregates.get('total_distance') or 0
@@ -348,10 +388,9 @@ class StatisticsService:
                     'value': float(daily_avg_unit_price)
                 })
         
-        # Average distance per day
-        if queryset.exists():
-            date_range = queryset.aggregate(first_entry_date=Min('entry_date'), last_entry_date=Max('entry_date'))
-            period_days = (date_range['last_entry_date'] - date_range['first_entry_date']).days + 1 if date_range['last_entry_date'] and date_range['first_entry_date'] else 1
+        # Average distance per day (entry date range comes from the aggregates query)
+        if aggregates['entry_count']:
+            period_days = (aggregates['last_entry_date'] - aggregates['first_entry_date']).days + 1
         else:
             period_days = (period_dates['date_before'] - period_dates['date_after']).days + 1
 
@@ -387,6 +426,32 @@ class StatisticsService:
         
         return result
 
+    @staticmethod
+    def _format_group_statistics(label: str, group: str, stat: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Form statistics of one brand/grade group with correct average calculation.
+
+        Args:
+            label: Result key for the group name ('brand' or 'grade')
+            group: Group name
+            stat: Totals of the group (total_liters, total_cost, total_distance, fill_count)
+        """
+        total_liters = stat['total_liters'] or 0
+        total_cost = stat['total_cost'] or 0
+        total_distance = stat['total_distance'] or 0
+
+        avg_consumption = (total_liters / total_distance * 100) if total_distance > 0 else None
+        avg_unit_price = (total_cost / total_liters) if total_liters > 0 else None
+        avg_cost_per_km = (total_cost / total_distance) if total_distance > 0 else None
+
+        return {
+            label: group,
+            'average_consumption': round(float(avg_consumption), 1) if avg_consumption else None,
+            'average_unit_price': round(float(avg_unit_price), 2) if avg_unit_price else None,
+            'average_cost_per_km': round(float(avg_cost_per_km), 4) if avg_cost_per_km else None,
+            'fill_count': stat['fill_count']
+        }
+
     @staticmethod
     def calculate_brand_statistics(
         user_id: int,
@@ -403,44 +468,27 @@ class StatisticsService:
             List[Dict] with statistics for each brand
         """
         # Base queryset with filtering by user
-        # Use select_related for query optimization
-        queryset = FuelEntry.objects.filter(user_id=user_id).select_related('vehicle')
+        queryset = FuelEntry.objects.filter(user_id=user_id)
 
         # Filter by vehicle (if specified)
         if vehicle_id:
             queryset = queryset.filter(vehicle_id=vehicle_id)
 
         # One query to get all brand data
-        # Use values() for grouping and aggregation
+        # Only columns of the covering brand indexes are read
         brand_stats = queryset.exclude(
-            Q(fuel_brand__isnull=True) | Q(fuel_brand='')
+            fuel_brand=''
         ).values('fuel_brand').annotate(
             total_liters=Sum('liters'),
             total_cost=Sum('total_amount'),
             total_distance=Sum('distance_since_last'),
-            fill_count=Count('id')
+            fill_count=Count('*')
         ).order_by('-fill_count')
 
-        # Form result with correct average calculation
-        result = []
-        for stat in brand_stats:
-            total_liters = stat['total_liters'] or 0
-            total_cost = stat['total_cost'] or 0
-            total_distance = stat['total_distance'] or 0
-
-            avg_consumption = (total_liters / total_distance * 100) if total_distance > 0 else None
-            avg_unit_price = (total_cost / total_liters) if total_liters > 0 else None
-            avg_cost_per_km = (total_cost / total_distance) if total_distance > 0 else None
-
-            result.append({
-                'brand': stat['fuel_brand'],
-                'average_consumption': round(float(avg_consumption), 1) if avg_consumption else None,
-                'average_unit_price': round(float(avg_unit_price), 2) if avg_unit_price else None,
-                'average_cost_per_km': round(float(avg_cost_per_km), 4) if avg_cost_per_km else None,
-                'fill_count': stat['fill_count']
-            })
-
-        return result
+        return [
+            StatisticsService._format_group_statistics('brand', stat['fuel_brand'], stat)
+            for stat in brand_stats
+        ]
 
     @staticmethod
     def calculate_grade_statistics(
@@ -458,41 +506,80 @@ class StatisticsService:
             List[Dict] with statistics for each grade
         """
         # Base queryset with filtering by user
-        # Use select_related for query optimization
-        queryset = FuelEntry.objects.filter(user_id=user_id).select_related('vehicle')
+        queryset = FuelEntry.objects.filter(user_id=user_id)
 
         # Filter by vehicle (if specified)
         if vehicle_id:
             queryset = queryset.filter(vehicle_id=vehicle_id)
 
         # One query to get all grade data
-        # Use values() for grouping and aggregation
+        # Only columns of the covering grade indexes are read
         grade_stats = queryset.exclude(
-            Q(fuel_grade__isnull=True) | Q(fuel_grade='')
+            fuel_grade=''
         ).values('fuel_grade').annotate(
             total_liters=Sum('liters'),
             total_cost=Sum('total_amount'),
             total_distance=Sum('distance_since_last'),
-            fill_count=Count('id')
+            fill_count=Count('*')
         ).order_by('-fill_count')
 
-        # Form result with correct average calculation
-        result = []
-        for stat in grade_stats:
-            total_liters = stat['total_liters'] or 0
-            total_cost = stat['total_cost'] or 0
-            total_distance = stat['total_distance'] or 0
+        return [
+            StatisticsService._format_group_statistics('grade', stat['fuel_grade'], stat)
+            for stat in grade_stats
+        ]
 
-            avg_consumption = (total_liters / total_distance * 100) if total_distance > 0 else None
-            avg_unit_price = (total_cost / total_liters) if total_liters > 0 else None
-            avg_cost_per_km = (total_cost / total_distance) if total_distance > 0 else None
+    @staticmethod
+    def calculate_brand_and_grade_statistics(
+        user_id: int,
+        vehicle_id: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Calculate fuel brand and grade statistics (all-time) in one pass.
+        Same results as calculate_brand_statistics and calculate_grade_statistics,
+        using GROUP BY GROUPING SETS so the entries are scanned once.
 
-            result.append({
-                'grade': stat['fuel_grade'],
-                'average_consumption': round(float(avg_consumption), 1) if avg_consumption else None,
-                'average_unit_price': round(float(avg_unit_price), 2) if avg_unit_price else None,
-                'average_cost_per_km': round(float(avg_cost_per_km), 4) if avg_cost_per_km else None,
-                'fill_count': stat['fill_count']
-            })
+        Args:
+            user_id: User ID
+            vehicle_id: Vehicle ID (optional)
+
+        Returns:
+            Dict with 'brands' and 'grades' lists
+        """
+        table = connection.ops.quote_name(FuelEntry._meta.db_table)
+        params = [user_id]
+        vehicle_filter = ''
+        if vehicle_id:
+            vehicle_filter = 'AND vehicle_id = %s'
+            params.append(vehicle_id)
+
+        sql = f"""
+            SELECT
+                GROUPING(fuel_brand) = 1 AS is_grade,
+                COALESCE(fuel_brand, fuel_grade) AS group_name,
+                SUM(liters) AS total_liters,
+                SUM(total_amount) AS total_cost,
+                SUM(distance_since_last) AS total_distance,
+                COUNT(*) AS fill_count
+            FROM {table}
+            WHERE user_id = %s {vehicle_filter}
+            GROUP BY GROUPING SETS ((fuel_brand), (fuel_grade))
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        result = {'brands': [], 'grades': []}
+        for stat in sorted(rows, key=lambda row: -row['fill_count']):
+            if not stat['group_name']:
+                continue
+            if stat['is_grade']:
+                result['grades'].append(
+                    StatisticsService._format_group_statistics('grade', stat['group_name'], stat)
+                )
+            else:
+                result['brands'].append(
+                    StatisticsService._format_group_statistics('brand', stat['group_name'], stat)
+                )
 
         return result
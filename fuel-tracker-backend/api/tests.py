@@ -1,3 +1,5 @@
+import json
+from unittest import mock
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
@@ -101,6 +103,98 @@ class StatisticsAPITestCase(APITestCase):
         self.assertIn('total_distance', aggregates)
         self.assertEqual(aggregates['entry_count'], 2)  # 2 entries in 30d period
     
+    def test_combined_statistics(self):
+        """Test dashboard, brand and grade statistics in one response"""
+        self.client.force_authenticate(user=self.user)
+        
+        response = self.client.get('/api/v1/statistics/combined', {'period': '30d'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['dashboard']['aggregates']['entry_count'], 2)
+        self.assertEqual({row['brand'] for row in response.data['brands']}, {'Shell', 'BP'})
+        self.assertEqual([row['grade'] for row in response.data['grades']], ['95'])
+    
+    def test_dashboard_statistics_etag(self):
+        """Test unchanged statistics are revalidated with ETag"""
+        self.client.force_login(self.user)
+        
+        response = self.client.get('/api/v1/statistics/dashboard')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+        
+        response = self.client.get('/api/v1/statistics/dashboard', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_dashboard_statistics_etag_changes_next_day(self):
+        """Test relative period statistics are not revalidated on the next day"""
+        # Session login: the cache decorator runs before DRF authentication
+        self.client.force_login(self.user)
+        
+        response = self.client.get('/api/v1/statistics/dashboard', {'period': '30d'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        
+        tomorrow = date.today() + timedelta(days=1)
+        with mock.patch('api.views.statistics_cache_date', return_value=tomorrow):
+            response = self.client.get('/api/v1/statistics/dashboard', {'period': '30d'}, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_combined_statistics_etag(self):
+        """Test unchanged combined statistics are revalidated with ETag"""
+        self.client.force_login(self.user)
+        
+        response = self.client.get('/api/v1/statistics/combined')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        
+        response = self.client.get('/api/v1/statistics/combined', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_combined_statistics_etag_changes_after_entry_created(self):
+        """Test creating an entry invalidates combined statistics"""
+        self.client.force_login(self.user)
+        
+        etag = self.client.get('/api/v1/statistics/combined')['ETag']
+        
+        # Cache version is bumped on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/fuel-entries', {
+                'vehicle': self.vehicle.id,
+                'entry_date': date.today().strftime('%Y-%m-%d'),
+                'odometer': 11500,
+                'station_name': 'BP',
+                'fuel_brand': 'BP',
+                'fuel_grade': '98',
+                'liters': '40.00',
+                'total_amount': '64.00'
+            })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        response = self.client.get('/api/v1/statistics/combined', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            json.loads(response.content)['dashboard']['aggregates']['entry_count'], 3
+        )
+    
+    def test_combined_statistics_etag_changes_after_vehicle_deleted(self):
+        """Test deleting a vehicle invalidates combined statistics"""
+        self.client.force_login(self.user)
+        
+        etag = self.client.get('/api/v1/statistics/combined')['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/v1/vehicles/{self.vehicle.id}')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        
+        response = self.client.get('/api/v1/statistics/combined', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['brands'], [])
+    
     def test_dashboard_statistics_unauthenticated(self):
         """Test access without authentication"""
         response = self.client.get('/api/v1/statistics/dashboard')
@@ -115,6 +209,35 @@ class StatisticsAPITestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
     
+    def test_dashboard_statistics_custom_period_validation(self):
+        """Test custom period without dates, reversed and longer than 365 days"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/v1/statistics/dashboard', {'period': 'custom'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/v1/statistics/dashboard', {
+            'period': 'custom',
+            'date_after': '2023-01-01',
+            'date_before': '2024-06-01'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/v1/statistics/dashboard', {
+            'period': 'custom',
+            'date_after': '2024-06-01',
+            'date_before': '2024-05-01'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dashboard_statistics_invalid_vehicle(self):
+        """Test with non-numeric vehicle ID"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/v1/statistics/dashboard', {'vehicle': 'abc'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
     def test_dashboard_statistics_vehicle_filter(self):
         """Test filtering by vehicle"""
         self.client.force_authenticate(user=self.user)
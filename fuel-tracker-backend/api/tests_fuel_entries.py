@@ -215,6 +215,28 @@ class FuelEntryCRUDTestCase(APITestCase):
         self.assertIsNotNone(entry3.distance_since_last)
         self.assertIsNotNone(entry3.consumption_l_100km)
     
+    def test_update_notes_skips_metrics_recalculation(self):
+        """Editing only notes does not recalculate metrics"""
+        entry = FuelEntry.objects.create(
+            vehicle=self.vehicle,
+            user=self.user,
+            entry_date=date.today(),
+            odometer=10000,
+            station_name='Shell',
+            fuel_brand='Shell',
+            fuel_grade='95',
+            liters=Decimal('50.00'),
+            total_amount=Decimal('2750.00')
+        )
+        
+        response = self.client.patch(f'/api/v1/fuel-entries/{entry.id}', {'notes': 'Car wash'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        entry.refresh_from_db()
+        self.assertEqual(entry.notes, 'Car wash')
+        # Entry was created without metrics and they were left untouched
+        self.assertIsNone(entry.distance_since_last)
+    
     def test_delete_fuel_entry(self):
         """FUEL-006: Deleting fuel entry with metrics recalculation"""
         # Create three entries
@@ -294,6 +316,10 @@ class FuelEntryCRUDTestCase(APITestCase):
         
         # By default should return 25 entries
         self.assertEqual(len(response.data['results']), 25)
+
+        # Client can request smaller pages
+        response = self.client.get('/api/v1/fuel-entries?page_size=10')
+        self.assertEqual(len(response.data['results']), 10)
     
     def test_list_fuel_entries_with_filters(self):
         """Getting list with filters by vehicle and date"""
@@ -1,6 +1,7 @@
 """
 Unit tests for business logic services
 """
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from datetime import date, timedelta
@@ -199,6 +200,30 @@ class FuelEntryMetricsServiceTestCase(TestCase):
         entry3.refresh_from_db()
         self.assertEqual(entry3.distance_since_last, 400)  # 11000 - 10600
     
+    def test_recalculate_metrics_after_entry_same_day(self):
+        """Test later entry on the same day is recalculated too"""
+        today = date.today()
+        entries = []
+        for odometer in (10000, 10300, 10500):
+            entry = FuelEntry.objects.create(
+                vehicle=self.vehicle,
+                user=self.user,
+                entry_date=today,
+                odometer=odometer,
+                station_name='Shell',
+                fuel_brand='Shell',
+                fuel_grade='95',
+                liters=Decimal('20.00'),
+                total_amount=Decimal('1100.00')
+            )
+            entries.append(entry)
+        
+        count = FuelEntryMetricsService.recalculate_metrics_after_entry(entries[0])
+        
+        self.assertEqual(count, 2)
+        entries[2].refresh_from_db()
+        self.assertEqual(entries[2].distance_since_last, 200)  # 10500 - 10300
+    
     def test_insert_entry_with_earlier_date(self):
         """Test inserting entry with earlier date"""
         # Create two entries
@@ -298,6 +323,11 @@ class FuelEntryMetricsServiceTestCase(TestCase):
             self.assertIsNotNone(entries[i].distance_since_last)
             self.assertGreater(entries[i].distance_since_last, 0)
 
+        # 42 L over 500 km, 2310 for 500 km
+        self.assertEqual(entries[1].unit_price, Decimal('55.000'))
+        self.assertEqual(entries[1].consumption_l_100km, Decimal('8.4'))
+        self.assertEqual(entries[1].cost_per_km, Decimal('4.6200'))
+
 
 class StatisticsServiceTestCase(TestCase):
     """
@@ -471,3 +501,61 @@ class StatisticsServiceTestCase(TestCase):
         self.assertEqual(result['aggregates']['total_cost'], 0)
         self.assertEqual(result['aggregates']['total_fuel'], 0)
 
+    
+    def test_invalidate_cache_deferred_until_commit(self):
+        """Test statistics cache version is bumped only after commit"""
+        version_key = f'stats_version_user_{self.user.id}'
+        cache.delete(version_key)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            StatisticsService.invalidate_cache(self.user.id)
+            # Not bumped while transaction is still open
+            self.assertIsNone(cache.get(version_key))
+        
+        self.assertEqual(cache.get(version_key), 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            StatisticsService.invalidate_cache(self.user.id)
+        self.assertEqual(cache.get(version_key), 3)
+    
+    def test_calculate_brand_and_grade_statistics(self):
+        """Test single-pass brand/grade statistics match the separate ones"""
+        # Second vehicle: another grade, and a brand that is left empty
+        other_vehicle = Vehicle.objects.create(user=self.user, name='Other Car')
+        for odometer, brand, grade in ((500, 'BP', '98'), (900, '', '98'), (1400, 'Shell', '92')):
+            entry = FuelEntry.objects.create(
+                vehicle=other_vehicle,
+                user=self.user,
+                entry_date=date.today() - timedelta(days=1400 - odometer),
+                odometer=odometer,
+                station_name='Station',
+                fuel_brand=brand,
+                fuel_grade=grade,
+                liters=Decimal('40.00'),
+                total_amount=Decimal('2200.00')
+            )
+            FuelEntryMetricsService.calculate_metrics(entry)
+            entry.save()
+        
+        def by_name(rows, key):
+            return sorted(rows, key=lambda row: row[key])
+        
+        for vehicle_id in (None, self.vehicle.id, other_vehicle.id):
+            with self.subTest(vehicle_id=vehicle_id):
+                result = StatisticsService.calculate_brand_and_grade_statistics(
+                    user_id=self.user.id, vehicle_id=vehicle_id
+                )
+                brands = StatisticsService.calculate_brand_statistics(
+                    user_id=self.user.id, vehicle_id=vehicle_id
+                )
+                grades = StatisticsService.calculate_grade_statistics(
+                    user_id=self.user.id, vehicle_id=vehicle_id
+                )
+                
+                self.assertEqual(by_name(result['brands'], 'brand'), by_name(brands, 'brand'))
+                self.assertEqual(by_name(result['grades'], 'grade'), by_name(grades, 'grade'))
+        
+        # Empty brand is not a group
+        result = StatisticsService.calculate_brand_and_grade_statistics(user_id=self.user.id)
+        self.assertEqual({row['brand'] for row in result['brands']}, {'Shell', 'BP'})
+        self.assertEqual({row['grade'] for row in result['grades']}, {'92', '95', '98'})
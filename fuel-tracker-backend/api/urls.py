@@ -6,7 +6,8 @@ from .views import (
     FuelEntryViewSet,
     dashboard_statistics,
     brand_statistics,
-    grade_statistics
+    grade_statistics,
+    combined_statistics
 )
 
 # Router for automatic URL creation for ViewSets
@@ -22,6 +23,7 @@ urlpatterns = [
     path('statistics/dashboard', dashboard_statistics, name='dashboard-statistics'),
     path('statistics/by-brand', brand_statistics, name='brand-statistics'),
     path('statistics/by-grade', grade_statistics, name='grade-statistics'),
+    path('statistics/combined', combined_statistics, name='combined-statistics'),
     # OpenAPI Schema
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
     # Swagger UI
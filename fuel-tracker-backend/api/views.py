@@ -1,12 +1,13 @@
-from datetime import datetime
+from functools import wraps
 import hashlib
 from django.db import transaction
 from django.core.cache import cache
-from django.utils.decorators import method_decorator
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils import timezone
-from django.views.decorators.cache import cache_page
+from redis.exceptions import LockError
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.pagination import CursorPagination, PageNumberPagination
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample, OpenApiResponse
@@ -17,27 +18,164 @@ from .serializers import (
     FuelEntrySerializer,
     DashboardStatisticsResponseSerializer,
     BrandStatisticsSerializer,
-    GradeStatisticsSerializer
+    GradeStatisticsSerializer,
+    CombinedStatisticsSerializer,
+    StatisticsQuerySerializer,
+    DashboardStatisticsQuerySerializer
 )
 from .permissions import IsOwner
 from .services import FuelEntryMetricsService, StatisticsService
 
 
-def generate_safe_cache_key(prefix, user_id, **kwargs):
+def generate_safe_cache_key(prefix, user_id, *parts):
     """
     Generate safe cache key using hash for user-controlled data.
     Protection against cache pollution and NoSQL injection via Redis keys.
+    Parts must always be passed in the same order for a given prefix.
     """
-    # Sort kwargs for consistency
-    sorted_params = sorted(kwargs.items())
-    params_str = '_'.join(f"{k}={v}" for k, v in sorted_params if v is not None)
+    params_str = ':'.join('' if part is None else str(part) for part in parts)
     
     # Create hash from parameters
-    params_hash = hashlib.md5(params_str.encode()).hexdigest()[:16]
+    params_hash = hashlib.blake2b(params_str.encode(), digest_size=8).hexdigest()
     
     return f"{prefix}_user{user_id}_{params_hash}"
 
 
+# Statistics responses are cached for 5 minutes (300 seconds)
+STATISTICS_CACHE_TIMEOUT = 300
+
+# Upper bound for holding (and waiting on) the recomputation lock
+STATISTICS_LOCK_TIMEOUT = 10
+
+
+# Brand and grade statistics are all-time, computed together and cached
+# per endpoint under these prefixes
+BRAND_STATISTICS_CACHE_PREFIX = 'brand_stats'
+GRADE_STATISTICS_CACHE_PREFIX = 'grade_stats'
+ALL_TIME_STATISTICS_PARAMS = ('vehicle',)
+
+
+def statistics_cache_date():
+    """
+    Date relative statistics periods end on (as in StatisticsService.get_period_dates).
+    """
+    return timezone.now().date()
+
+
+def statistics_cache_key(prefix, params, request, user_id):
+    """
+    Cache key of a statistics response: user, statistics version and query parameters.
+    """
+    version_key = f'stats_version_user_{user_id}'
+    stats_version = cache.get(version_key)
+    if stats_version is None:
+        # Persist the initial version so later requests don't miss on it;
+        # re-read in case an invalidation created the key concurrently
+        if cache.add(version_key, 1, timeout=None):
+            stats_version = 1
+        else:
+            stats_version = cache.get(version_key, 1)
+    parts = [request.GET.get(name) for name in params]
+    # Relative periods (30d, 90d, ytd, the default) end today, so the
+    # response changes with the date even when the data does not
+    if 'period' in params and request.GET.get('period') != 'custom':
+        parts.append(statistics_cache_date())
+    return generate_safe_cache_key(prefix, user_id, stats_version, *parts)
+
+
+def cache_statistics(cache_key, data):
+    """
+    Store rendered JSON so cache hits skip serialization entirely.
+    """
+    cache.set(cache_key, JSONRenderer().render(data), STATISTICS_CACHE_TIMEOUT)
+
+
+def cache_statistics_response(prefix, params):
+    """
+    Cache successful statistics responses per user and statistics version.
+
+    Must be applied on top of @api_view: a cache hit is answered straight
+    from the cached JSON body, skipping DRF authentication, permission checks and content
+    negotiation. The user is taken from Django's session middleware, so
+    anonymous requests always fall through to the DRF view (which rejects them).
+    Cache is invalidated by bumping the user's statistics version key.
+
+    On a miss the view runs under a Redis lock for the cache key, so concurrent
+    misses (cold start, right after invalidation) compute the statistics once
+    and the other workers read the result from cache.
+
+    Args:
+        prefix: Cache key prefix of the endpoint
+        params: Query parameters that affect the response
+    """
+    def build_cache_key(request, user_id):
+        return statistics_cache_key(prefix, params, request, user_id)
+
+    def cached_response(cache_key):
+        cached_body = cache.get(cache_key)
+        if cached_body is None:
+            return None
+        return HttpResponse(cached_body, content_type='application/json')
+
+    def store_response(request, response, cache_key=None):
+        # DRF sets the authenticated user on the Django request as well
+        if response.status_code == status.HTTP_200_OK and request.user.is_authenticated:
+            if cache_key is None:
+                cache_key = build_cache_key(request, request.user.id)
+            cache_statistics(cache_key, response.data)
+
+    def cached_or_computed_response(request, cache_key, view_func, *args, **kwargs):
+        response = cached_response(cache_key)
+        if response is not None:
+            return response
+
+        lock = cache.lock(f'lock:{cache_key}', timeout=STATISTICS_LOCK_TIMEOUT)
+        # If the lock can't be taken in time, compute without it
+        acquired = lock.acquire(blocking_timeout=STATISTICS_LOCK_TIMEOUT)
+        try:
+            # Another worker may have filled the cache while we waited
+            if acquired:
+                response = cached_response(cache_key)
+                if response is not None:
+                    return response
+
+            response = view_func(request, *args, **kwargs)
+            store_response(request, response, cache_key)
+            return response
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except LockError:
+                    # Lock expired while computing; nothing to release
+                    pass
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                response = view_func(request, *args, **kwargs)
+                store_response(request, response)
+                return response
+
+            cache_key = build_cache_key(request, request.user.id)
+            # Cache key changes with every statistics version (and day for
+            # relative periods), so it is a valid ETag
+            etag = f'"{cache_key}"'
+            if etag in request.headers.get('If-None-Match', ''):
+                response = HttpResponseNotModified()
+            else:
+                response = cached_or_computed_response(request, cache_key, view_func, *args, **kwargs)
+
+            if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+                response['ETag'] = etag
+                # Browser may keep the response but must revalidate it on each use
+                response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapped_view
+    return decorator
+
+
 class FuelEntryCursorPagination(CursorPagination):
     """
     Custom pagination for FuelEntry
@@ -45,27 +183,26 @@ class FuelEntryCursorPagination(CursorPagination):
     """
     page_size = 25
     max_page_size = 100  # DoS Protection: maximum 100 records at once
+    page_size_query_param = 'page_size'
     ordering = ['-entry_date', '-odometer']  # Sort by date desc, then odometer desc
+    # (sort_by, sort_order) -> ordering, precomputed once.
+    # Secondary sort by odometer (same direction) for entries on same day.
+    sort_orderings = {
+        (field, order): (f'-{field}', '-odometer') if order == 'desc' else (field, 'odometer')
+        for field in ('entry_date', 'odometer', 'total_amount', 'created_at')
+        for order in ('asc', 'desc')
+    }
 
     def get_ordering(self, request, queryset, view):
         """
         Get sorting from request parameters or use default
         """
         sort_by = request.query_params.get('sort_by', 'entry_date')
-        sort_order = request.query_params.get('sort_order', 'desc')
-
-        # Validation of sorting parameters
-        valid_sort_fields = ['entry_date', 'odometer', 'total_amount', 'created_at']
-        if sort_by in valid_sort_fields:
-            if sort_order == 'desc':
-                # When sorting by custom field, add secondary sort by odometer desc
-                return [f'-{sort_by}', '-odometer']
-            else:
-                # For ascending, use ascending order for both
-                return [sort_by, 'odometer']
+        # Anything other than 'desc' sorts ascending
+        sort_order = 'desc' if request.query_params.get('sort_order', 'desc') == 'desc' else 'asc'
 
-        # Default sorting: date desc, then odometer desc (for entries on same day)
-        return ['-entry_date', '-odometer']
+        # Unknown sort field falls back to default sorting: date desc, then odometer desc
+        return self.sort_orderings.get((sort_by, sort_order), self.ordering)
 
 
 class VehiclePagination(PageNumberPagination):
@@ -122,9 +259,9 @@ class VehicleViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """
         Data isolation: return only current user's vehicles.
-        Use select_related for query optimization.
+        The user is already known from the request, so no JOIN to the user table.
         """
-        return Vehicle.objects.filter(user=self.request.user).select_related('user')
+        return Vehicle.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         """
@@ -152,14 +289,17 @@ class VehicleViewSet(viewsets.ModelViewSet):
             FuelEntryMetricsService.recalculate_all_metrics_for_vehicle(vehicle.id)
 
             # Invalidate statistics cache for this user
-            self._invalidate_statistics_cache(vehicle.user_id)
+            StatisticsService.invalidate_cache(vehicle.user_id)
 
-    def _invalidate_statistics_cache(self, user_id: int):
+    @transaction.atomic
+    def perform_destroy(self, instance):
         """
-        Invalidates statistics cache for user by updating version key.
-        This makes all old cache entries invalid.
+        When deleting vehicle, its fuel entries are deleted as well,
+        so statistics cache is invalidated.
         """
-        cache.set(f'stats_version_user_{user_id}', timezone.now().timestamp())
+        user_id = instance.user_id
+        instance.delete()
+        StatisticsService.invalidate_cache(user_id)
 
 
 @extend_schema_view(
@@ -266,99 +406,114 @@ class FuelEntryViewSet(viewsets.ModelViewSet):
     serializer_class = FuelEntrySerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     pagination_class = FuelEntryCursorPagination
+    # Optional list filters: query parameter -> ORM lookup
+    filter_params = (
+        ('vehicle', 'vehicle_id'),
+        ('date_after', 'entry_date__gte'),
+        ('date_before', 'entry_date__lte'),
+        ('fuel_brand', 'fuel_brand__icontains'),
+        ('fuel_grade', 'fuel_grade__icontains'),
+        ('station_name', 'station_name__icontains'),
+    )
+    # Fields that entry metrics are calculated from
+    metric_source_fields = ('vehicle', 'entry_date', 'odometer', 'liters', 'total_amount')
+    # Other fields that statistics are grouped by
+    statistics_fields = ('fuel_brand', 'fuel_grade')
 
     def get_queryset(self):
         """
         Data isolation: return only current user's entries.
-        Use select_related for optimization of related object queries.
+        Use select_related for the vehicle on single-entry actions (needed for
+        metrics on writes). Serializer reads only FK ids, so list pages
+        skip the join. The user is already known from the request.
         """
-        queryset = FuelEntry.objects.filter(user=self.request.user).select_related('vehicle', 'user')
-        
-        # Filter by vehicle (optional)
-        vehicle_id = self.request.query_params.get('vehicle', None)
-        if vehicle_id is not None:
-            queryset = queryset.filter(vehicle_id=vehicle_id)
-        
-        # Filter by date range (optional)
-        date_after = self.request.query_params.get('date_after', None)
-        date_before = self.request.query_params.get('date_before', None)
-        
-        if date_after:
-            queryset = queryset.filter(entry_date__gte=date_after)
-        if date_before:
-            queryset = queryset.filter(entry_date__lte=date_before)
-        
-        # Filter by fuel brand (optional)
-        fuel_brand = self.request.query_params.get('fuel_brand', None)
-        if fuel_brand:
-            queryset = queryset.filter(fuel_brand__icontains=fuel_brand)
-        
-        # Filter by fuel grade (optional)
-        fuel_grade = self.request.query_params.get('fuel_grade', None)
-        if fuel_grade:
-            queryset = queryset.filter(fuel_grade__icontains=fuel_grade)
-        
-        # Filter by station name (optional)
-        station_name = self.request.query_params.get('station_name', None)
-        if station_name:
-            queryset = queryset.filter(station_name__icontains=station_name)
+        params = self.request.query_params
+        # Collect all optional filters and apply them with a single .filter() call
+        filters = {
+            lookup: params[param]
+            for param, lookup in self.filter_params
+            if params.get(param)
+        }
         
+        queryset = FuelEntry.objects.filter(user=self.request.user, **filters)
+        if self.action != 'list':
+            queryset = queryset.select_related('vehicle')
         return queryset
 
+    def _calculate_metric_fields(self, **entry_data):
+        """
+        Calculate metrics for entry data before it is saved,
+        so the entry is written with its metrics in a single query.
+        """
+        entry = FuelEntry(**entry_data)
+        FuelEntryMetricsService.calculate_metrics(entry)
+        return {
+            'unit_price': entry.unit_price,
+            'distance_since_last': entry.distance_since_last,
+            'consumption_l_100km': entry.consumption_l_100km,
+            'cost_per_km': entry.cost_per_km,
+        }
+
     @transaction.atomic
     def perform_create(self, serializer):
         """
         When creating entry:
-        1. Bind to current user
-        2. Save to DB
-        3. Calculate metrics
-        4. Recalculate metrics for subsequent entries (if any)
-        5. Invalidate statistics cache
+        1. Calculate metrics
+        2. Save to DB with current user and metrics (single INSERT)
+        3. Recalculate metrics for subsequent entries (if any)
+        4. Invalidate statistics cache
         """
-        # Save entry
-        fuel_entry = serializer.save(user=self.request.user)
-        
-        # Calculate metrics for current entry
-        FuelEntryMetricsService.calculate_metrics(fuel_entry)
-        fuel_entry.save(update_fields=[
-            'unit_price', 
-            'distance_since_last', 
-            'consumption_l_100km', 
-            'cost_per_km'
-        ])
+        # Calculate metrics and save entry together with them
+        metrics = self._calculate_metric_fields(**serializer.validated_data)
+        fuel_entry = serializer.save(user=self.request.user, **metrics)
         
         # Recalculate metrics for all subsequent entries
         FuelEntryMetricsService.recalculate_metrics_after_entry(fuel_entry)
         
         # Invalidate statistics cache for this user
-        self._invalidate_statistics_cache(fuel_entry.user_id)
+        StatisticsService.invalidate_cache(fuel_entry.user_id)
 
     @transaction.atomic
     def perform_update(self, serializer):
         """
         When updating entry:
-        1. Save changes
-        2. Recalculate metrics for current entry
+        1. Recalculate metrics for current entry
+        2. Save changes together with metrics (single UPDATE)
         3. Recalculate metrics for all subsequent entries
         4. Invalidate statistics cache
+        
+        Steps 1 and 3 are skipped when no metric source field changed,
+        and step 4 when statistics are not affected either (e.g. notes edit).
         """
-        # Save updated entry
-        fuel_entry = serializer.save()
+        instance = serializer.instance
+        changed_fields = {
+            field for field, value in serializer.validated_data.items()
+            if getattr(instance, field) != value
+        }
         
-        # Recalculate metrics for current entry
-        FuelEntryMetricsService.calculate_metrics(fuel_entry)
-        fuel_entry.save(update_fields=[
-            'unit_price', 
-            'distance_since_last', 
-            'consumption_l_100km', 
-            'cost_per_km'
-        ])
+        if not changed_fields.intersection(self.metric_source_fields):
+            fuel_entry = serializer.save()
+            if changed_fields.intersection(self.statistics_fields):
+                StatisticsService.invalidate_cache(fuel_entry.user_id)
+            return
+        
+        # Recalculate metrics for current entry and save them with the changes
+        metrics = self._calculate_metric_fields(**{
+            'id': instance.id,
+            'vehicle': instance.vehicle,
+            'entry_date': instance.entry_date,
+            'odometer': instance.odometer,
+            'liters': instance.liters,
+            'total_amount': instance.total_amount,
+            **serializer.validated_data,
+        })
+        fuel_entry = serializer.save(**metrics)
         
         # Recalculate metrics for all subsequent entries
         FuelEntryMetricsService.recalculate_metrics_after_entry(fuel_entry)
         
         # Invalidate statistics cache for this user
-        self._invalidate_statistics_cache(fuel_entry.user_id)
+        StatisticsService.invalidate_cache(fuel_entry.user_id)
 
     @transaction.atomic
     def perform_destroy(self, instance):
@@ -379,16 +534,10 @@ class FuelEntryViewSet(viewsets.ModelViewSet):
         FuelEntryMetricsService.recalculate_all_metrics_for_vehicle(vehicle_id)
         
         # Invalidate statistics cache for this user
-        self._invalidate_statistics_cache(user_id)
+        StatisticsService.invalidate_cache(user_id)
     
-    def _invalidate_statistics_cache(self, user_id: int):
-        """
-        Invalidates statistics cache for user by updating version key.
-        This makes all old cache entries invalid.
-        """
-        cache.set(f'stats_version_user_{user_id}', timezone.now().timestamp())
-
 
+@cache_statistics_response('dashboard_stats', ('vehicle', 'period', 'date_after', 'date_before'))
 @extend_schema(
     summary="Get dashboard statistics",
     description="Retrieve aggregated statistics for the dashboard. Supports filtering by vehicle and time period. "
@@ -478,89 +627,43 @@ def dashboard_statistics(request):
     Uses caching for performance optimization.
     Cache is invalidated when creating/updating/deleting entries.
     """
-    user_id = request.user.id
-    vehicle_id = request.query_params.get('vehicle', None)
-    period_type = request.query_params.get('period', '30d')
-    date_after_str = request.query_params.get('date_after', None)
-    date_before_str = request.query_params.get('date_before', None)
-    
-    # Validation period_type
-    if period_type not in ['30d', '90d', 'ytd', 'custom']:
-        return Response(
-            {'errors': [{'status': '400', 'code': 'invalid_period', 'detail': 'Invalid period type. Must be one of: 30d, 90d, ytd, custom'}]},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Parse dates for custom period
-    date_after = None
-    date_before = None
-    if period_type == 'custom':
-        if not date_after_str or not date_before_str:
-            return Response(
-                {'errors': [{'status': '400', 'code': 'missing_dates', 'detail': 'Custom period requires date_after and date_before parameters'}]},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        try:
-            date_after = datetime.strptime(date_after_str, '%Y-%m-%d').date()
-            date_before = datetime.strptime(date_before_str, '%Y-%m-%d').date()
-        except ValueError:
-            return Response(
-                {'errors': [{'status': '400', 'code': 'invalid_date_format', 'detail': 'Invalid date format. Use YYYY-MM-DD'}]},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-    
-    # Validate custom period range (DoS protection via large periods)
-    if period_type == 'custom' and date_after and date_before:
-        date_range = (date_before - date_after).days
-        if date_range > 365:
-            return Response({
-                'errors': [{
-                    'status': '400',
-                    'code': 'period_too_long',
-                    'detail': 'Custom period cannot exceed 365 days'
-                }]
-            }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Get statistics cache version key
-    stats_version = cache.get(f'stats_version_user_{user_id}', 1)
-    
-    # Form safe cache key (protection against cache pollution)
-    cache_key = generate_safe_cache_key(
-        'dashboard_stats',
-        user_id,
-        version=stats_version,
-        vehicle=vehicle_id,
-        period=period_type,
-        after=date_after_str,
-        before=date_before_str
-    )
-    
-    # Try to get from cache
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return Response(cached_result)
-    
+    query = DashboardStatisticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+
     # Calculate statistics
-    try:
-        result = StatisticsService.calculate_dashboard_statistics(
-            user_id=user_id,
-            vehicle_id=int(vehicle_id) if vehicle_id else None,
-            period_type=period_type,
-            date_after=date_after,
-            date_before=date_before
-        )
-    except ValueError as e:
-        return Response(
-            {'errors': [{'status': '400', 'code': 'calculation_error', 'detail': str(e)}]},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Cache for 5 minutes (300 seconds)
-    cache.set(cache_key, result, 300)
+    result = StatisticsService.calculate_dashboard_statistics(
+        user_id=request.user.id,
+        vehicle_id=params.get('vehicle'),
+        period_type=params['period'],
+        date_after=params.get('date_after'),
+        date_before=params.get('date_before')
+    )
 
     return Response(result)
 
 
+def all_time_statistics(request, vehicle_id, other_prefix):
+    """
+    Brand and grade statistics from one aggregation pass.
+
+    The brand and grade endpoints each need one of the two lists; the other
+    list is cached for the other endpoint (under other_prefix), so a page
+    that loads both scans the entries once.
+    """
+    # Key is taken before computing, so an invalidation during the query
+    # is not cached under the new version
+    other_cache_key = statistics_cache_key(other_prefix, ALL_TIME_STATISTICS_PARAMS, request, request.user.id)
+    result = StatisticsService.calculate_brand_and_grade_statistics(
+        user_id=request.user.id,
+        vehicle_id=vehicle_id
+    )
+    other_key = 'grades' if other_prefix == GRADE_STATISTICS_CACHE_PREFIX else 'brands'
+    cache_statistics(other_cache_key, result[other_key])
+    return result
+
+
+@cache_statistics_response(BRAND_STATISTICS_CACHE_PREFIX, ALL_TIME_STATISTICS_PARAMS)
 @extend_schema(
     summary="Get statistics by fuel brand",
     description="Retrieve all-time statistics grouped by fuel brand. Includes average consumption, "
@@ -618,37 +721,15 @@ def brand_statistics(request):
     - average_cost_per_km: average cost per km
     - fill_count: number of fill-ups
     """
-    user_id = request.user.id
-    vehicle_id = request.query_params.get('vehicle', None)
-    
-    # Get statistics cache version key
-    stats_version = cache.get(f'stats_version_user_{user_id}', 1)
-    
-    # Form safe cache key
-    cache_key = generate_safe_cache_key(
-        'brand_stats',
-        user_id,
-        version=stats_version,
-        vehicle=vehicle_id
-    )
-    
-    # Try to get from cache
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return Response(cached_result)
-
-    # Calculate statistics
-    result = StatisticsService.calculate_brand_statistics(
-        user_id=user_id,
-        vehicle_id=int(vehicle_id) if vehicle_id else None
-    )
+    query = StatisticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
 
-    # Cache for 5 minutes (300 seconds)
-    cache.set(cache_key, result, 300)
+    result = all_time_statistics(request, query.validated_data.get('vehicle'), GRADE_STATISTICS_CACHE_PREFIX)
 
-    return Response(result)
+    return Response(result['brands'])
 
 
+@cache_statistics_response(GRADE_STATISTICS_CACHE_PREFIX, ALL_TIME_STATISTICS_PARAMS)
 @extend_schema(
     summary="Get statistics by fuel grade",
     description="Retrieve all-time statistics grouped by fuel grade (octane number). Includes average consumption, "
@@ -705,32 +786,91 @@ def grade_statistics(request):
     - average_cost_per_km: average cost per km
     - fill_count: number of fill-ups
     """
-    user_id = request.user.id
-    vehicle_id = request.query_params.get('vehicle', None)
-    
-    # Get statistics cache version key
-    stats_version = cache.get(f'stats_version_user_{user_id}', 1)
-    
-    # Form safe cache key
-    cache_key = generate_safe_cache_key(
-        'grade_stats',
-        user_id,
-        version=stats_version,
-        vehicle=vehicle_id
-    )
-    
-    # Try to get from cache
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return Response(cached_result)
+    query = StatisticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
 
-    # Calculate statistics
-    result = StatisticsService.calculate_grade_statistics(
-        user_id=user_id,
-        vehicle_id=int(vehicle_id) if vehicle_id else None
-    )
+    result = all_time_statistics(request, query.validated_data.get('vehicle'), BRAND_STATISTICS_CACHE_PREFIX)
 
-    # Cache for 5 minutes (300 seconds)
-    cache.set(cache_key, result, 300)
+    return Response(result['grades'])
+
+
+@cache_statistics_response('combined_stats', ('vehicle', 'period', 'date_after', 'date_before'))
+@extend_schema(
+    summary="Get combined dashboard, brand and grade statistics",
+    description="Retrieve dashboard statistics together with brand and grade statistics in a single request, "
+                "for pages that show all three. Accepts the same parameters as the dashboard endpoint; "
+                "the period applies to dashboard statistics only, brand and grade statistics are all-time. "
+                "Results are cached for 5 minutes for performance optimization.",
+    tags=['Statistics'],
+    responses={
+        200: CombinedStatisticsSerializer,
+        400: OpenApiResponse(description="Validation error (invalid period, missing dates for custom period)"),
+    },
+    parameters=[
+        OpenApiParameter(
+            name='vehicle',
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            description='Filter statistics by vehicle ID. If omitted, aggregates across all vehicles.',
+            required=False,
+        ),
+        OpenApiParameter(
+            name='period',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description='Time period type for dashboard statistics. Options: 30d, 90d, ytd, custom (requires date_after and date_before)',
+            required=False,
+            enum=['30d', '90d', 'ytd', 'custom'],
+        ),
+        OpenApiParameter(
+            name='date_after',
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description='Start date for custom period (YYYY-MM-DD). Required when period=custom.',
+            required=False,
+        ),
+        OpenApiParameter(
+            name='date_before',
+            type=OpenApiTypes.DATE,
+            location=OpenApiParameter.QUERY,
+            description='End date for custom period (YYYY-MM-DD). Required when period=custom.',
+            required=False,
+        ),
+    ],
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def combined_statistics(request):
+    """
+    Endpoint for retrieving dashboard, brand and grade statistics at once.
+
+    Query Parameters: same as dashboard_statistics.
+
+    Returns:
+    - dashboard: dashboard statistics for the period
+    - brands: all-time statistics for each brand
+    - grades: all-time statistics for each grade
+    """
+    query = DashboardStatisticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+    vehicle_id = params.get('vehicle')
+
+    # All statistics are computed in one transaction on one connection;
+    # brand and grade statistics share a single aggregation pass
+    with transaction.atomic():
+        result = {
+            'dashboard': StatisticsService.calculate_dashboard_statistics(
+                user_id=request.user.id,
+                vehicle_id=vehicle_id,
+                period_type=params['period'],
+                date_after=params.get('date_after'),
+                date_before=params.get('date_before')
+            ),
+            **StatisticsService.calculate_brand_and_grade_statistics(
+                user_id=request.user.id,
+                vehicle_id=vehicle_id
+            ),
+        }
 
     return Response(result)
@@ -4,13 +4,42 @@ Custom exception handler for DRF.
 Provides consistent response format for all errors.
 """
 import logging
-from rest_framework.views import exception_handler as drf_exception_handler
+from rest_framework.views import exception_handler as drf_exception_handler, set_rollback
 from rest_framework import status
+from rest_framework.exceptions import (
+    ValidationError, AuthenticationFailed, NotAuthenticated,
+    PermissionDenied as DRFPermissionDenied, NotFound,
+    MethodNotAllowed, NotAcceptable, UnsupportedMediaType,
+    Throttled, ParseError
+)
+from rest_framework.response import Response
+from django.conf import settings
 from django.core.exceptions import PermissionDenied, ValidationError as DjangoValidationError
 from django.http import Http404
 
 logger = logging.getLogger(__name__)
 
+# Machine-readable error codes of DRF exceptions
+ERROR_CODE_MAP = {
+    ValidationError: 'validation_error',
+    AuthenticationFailed: 'authentication_failed',
+    NotAuthenticated: 'not_authenticated',
+    DRFPermissionDenied: 'permission_denied',
+    NotFound: 'not_found',
+    MethodNotAllowed: 'method_not_allowed',
+    NotAcceptable: 'not_acceptable',
+    UnsupportedMediaType: 'unsupported_media_type',
+    Throttled: 'throttled',
+    ParseError: 'parse_error',
+}
+
+# Resolved error code per concrete exception class (including subclasses)
+_error_code_cache = {}
+_ERROR_CODE_CACHE_MAX_SIZE = 1024
+
+# Django exceptions answered directly, without going through DRF handler
+_DJANGO_EXCEPTIONS = (Http404, PermissionDenied, DjangoValidationError)
+
 
 def custom_exception_handler(exc, context):
     """
@@ -34,20 +63,19 @@ def custom_exception_handler(exc, context):
         Returns:
         Response with standardized error format
     """
+    # Django exceptions have fixed responses, no need for DRF handler
+    if isinstance(exc, _DJANGO_EXCEPTIONS):
+        return django_exception_response(exc)
+    
     # Get standard response from DRF
     response = drf_exception_handler(exc, context)
     
-    # Extract correlation_id from request (if exists)
-    request = context.get('request')
-    correlation_id = getattr(request, 'correlation_id', 'N/A') if request else 'N/A'
-    
     # If DRF handled exception
     if response is not None:
         # Log error
         logger.error(
-            f"[{correlation_id}] Exception handled: {exc.__class__.__name__} | "
-            f"Status: {response.status_code} | "
-            f"Detail: {str(exc)}"
+            "Exception handled: %s | Status: %s | Detail: %s",
+            exc.__class__.__name__, response.status_code, exc
         )
         
         # Convert to standard format
@@ -60,9 +88,39 @@ def custom_exception_handler(exc, context):
         response.data = standardized_response
         return response
     
-    # Handle Django exceptions that DRF did not handle
+    # Unhandled exceptions (500)
+    logger.exception(
+        "Unhandled exception: %s | Detail: %s",
+        exc.__class__.__name__, exc
+    )
+    
+    # In production do not reveal internal error details
+    if settings.DEBUG:
+        detail = f"{exc.__class__.__name__}: {str(exc)}"
+    else:
+        detail = "An internal server error occurred. Please try again later."
+    
+    return create_error_response(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        error_code='internal_server_error',
+        detail=detail
+    )
+
+
+def django_exception_response(exc):
+    """
+    Build standardized response for Django Http404, PermissionDenied and ValidationError.
+    
+    Args:
+        exc: Exception (one of _DJANGO_EXCEPTIONS)
+    
+    Returns:
+        Response with standardized error format
+    """
     if isinstance(exc, Http404):
-        logger.error(f"[{correlation_id}] 404 Not Found: {str(exc)}")
+        logger.error("404 Not Found: %s", exc)
+        # Same as DRF handler: roll back atomic request on handled errors
+        set_rollback()
         return create_error_response(
             status_code=status.HTTP_404_NOT_FOUND,
             error_code='not_found',
@@ -70,38 +128,19 @@ def custom_exception_handler(exc, context):
         )
     
     if isinstance(exc, PermissionDenied):
-        logger.error(f"[{correlation_id}] 403 Permission Denied: {str(exc)}")
+        logger.error("403 Permission Denied: %s", exc)
+        set_rollback()
         return create_error_response(
             status_code=status.HTTP_403_FORBIDDEN,
             error_code='permission_denied',
             detail='You do not have permission to perform this action'
         )
     
-    if isinstance(exc, DjangoValidationError):
-        logger.error(f"[{correlation_id}] Django Validation Error: {str(exc)}")
-        return create_error_response(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            error_code='validation_error',
-            detail=str(exc)
-        )
-    
-    # Unhandled exceptions (500)
-    logger.exception(
-        f"[{correlation_id}] Unhandled exception: {exc.__class__.__name__} | "
-        f"Detail: {str(exc)}"
-    )
-    
-    # In production do not reveal internal error details
-    from django.conf import settings
-    if settings.DEBUG:
-        detail = f"{exc.__class__.__name__}: {str(exc)}"
-    else:
-        detail = "An internal server error occurred. Please try again later."
-    
+    logger.error("Django Validation Error: %s", exc)
     return create_error_response(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        error_code='internal_server_error',
-        detail=detail
+        status_code=status.HTTP_400_BAD_REQUEST,
+        error_code='validation_error',
+        detail=str(exc)
     )
 
 
@@ -117,7 +156,7 @@ def standardize_error_response(status_code, data, exc):
     Returns:
         dict: Standardized error format
     """
-    errors = []
+    status_str = str(status_code)
     
     # Determine error_code based on exception type
     error_code = get_error_code(exc)
@@ -126,46 +165,58 @@ def standardize_error_response(status_code, data, exc):
     if isinstance(data, dict):
         # If there is detail field - this is simple error
         if 'detail' in data:
-            errors.append({
-                'status': str(status_code),
+            errors = [{
+                'status': status_str,
                 'code': error_code,
                 'detail': data['detail']
-            })
+            }]
         # Otherwise these are field validation errors
         else:
-            for field, messages in data.items():
-                if isinstance(messages, list):
-                    for message in messages:
-                        errors.append({
-                            'status': str(status_code),
-                            'code': error_code,
-                            'detail': f"{field}: {message}" if field != 'non_field_errors' else message,
-                            'field': field if field != 'non_field_errors' else None
-                        })
-                else:
-                    errors.append({
-                        'status': str(status_code),
-                        'code': error_code,
-                        'detail': f"{field}: {messages}",
-                        'field': field
-                    })
+            # Copying prefilled template is faster than building each dict from a literal
+            template = {'status': status_str, 'code': error_code}
+            errors = []
+            for field, detail in _iter_field_errors(data):
+                error = template.copy()
+                error['detail'] = detail
+                error['field'] = field
+                errors.append(error)
     elif isinstance(data, list):
-        for item in data:
-            errors.append({
-                'status': str(status_code),
+        errors = [
+            {
+                'status': status_str,
                 'code': error_code,
                 'detail': str(item)
-            })
+            }
+            for item in data
+        ]
     else:
-        errors.append({
-            'status': str(status_code),
+        errors = [{
+            'status': status_str,
             'code': error_code,
             'detail': str(data)
-        })
+        }]
     
     return {'errors': errors}
 
 
+def _iter_field_errors(data):
+    """
+    Yield (field, detail) pairs for DRF field validation errors.
+    
+    non_field_errors messages are yielded with field None and without field prefix.
+    """
+    for field, messages in data.items():
+        if not isinstance(messages, list):
+            yield field, f"{field}: {messages}"
+        elif field == 'non_field_errors':
+            for message in messages:
+                yield None, message
+        else:
+            prefix = field + ': '
+            for message in messages:
+                yield field, prefix + str(message)
+
+
 def create_error_response(status_code, error_code, detail):
     """
     Create Response with standardized error format.
@@ -178,8 +229,6 @@ def create_error_response(status_code, error_code, detail):
     Returns:
         Response with formatted error
     """
-    from rest_framework.response import Response
-    
     return Response(
         {
             'errors': [{
@@ -195,6 +244,7 @@ def create_error_response(status_code, error_code, detail):
 def get_error_code(exc):
     """
     Determine machine-readable error code based on exception type.
+    Subclasses of mapped exceptions get the code of the nearest mapped base.
     
     Args:
         exc: Exception
@@ -202,25 +252,14 @@ def get_error_code(exc):
     Returns:
         str: Error code
     """
-    from rest_framework.exceptions import (
-        ValidationError, AuthenticationFailed, NotAuthenticated,
-        PermissionDenied as DRFPermissionDenied, NotFound,
-        MethodNotAllowed, NotAcceptable, UnsupportedMediaType,
-        Throttled, ParseError
-    )
-    
-    error_code_map = {
-        ValidationError: 'validation_error',
-        AuthenticationFailed: 'authentication_failed',
-        NotAuthenticated: 'not_authenticated',
-        DRFPermissionDenied: 'permission_denied',
-        NotFound: 'not_found',
-        MethodNotAllowed: 'method_not_allowed',
-        NotAcceptable: 'not_acceptable',
-        UnsupportedMediaType: 'unsupported_media_type',
-        Throttled: 'throttled',
-        ParseError: 'parse_error',
-    }
-    
-    return error_code_map.get(type(exc), 'error')
-
+    exc_class = type(exc)
+    code = _error_code_cache.get(exc_class)
+    if code is None:
+        code = next(
+            (ERROR_CODE_MAP[base] for base in exc_class.__mro__ if base in ERROR_CODE_MAP),
+            'error'
+        )
+        if len(_error_code_cache) >= _ERROR_CODE_CACHE_MAX_SIZE:
+            _error_code_cache.clear()
+        _error_code_cache[exc_class] = code
+    return code
@@ -0,0 +1,62 @@
+"""
+Background writing of log records.
+
+Request threads only put records on a queue, QueueListener threads
+do the actual stream/file I/O of the handlers configured in LOGGING.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listeners = []
+
+
+def start_queued_logging(logger_names):
+    """
+    Replace handlers of given loggers with QueueHandlers.
+
+    Each configured handler gets one queue and one listener thread,
+    shared by all loggers that use it. Safe to call more than once.
+    """
+    if _listeners:
+        return
+
+    queue_handlers = {}
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler):
+                continue
+            queue_handler = queue_handlers.get(handler)
+            if queue_handler is None:
+                queue_handler = queue_handlers[handler] = _start_listener(handler)
+            logger.removeHandler(handler)
+            logger.addHandler(queue_handler)
+
+    # Flush queued records on shutdown
+    atexit.register(stop_queued_logging)
+
+
+def stop_queued_logging():
+    """
+    Stop listener threads after they have written all queued records.
+    """
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def _start_listener(handler):
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(handler.level)
+
+    # Filters must run in the request thread, where correlation_id is set
+    for log_filter in list(handler.filters):
+        queue_handler.addFilter(log_filter)
+        handler.removeFilter(log_filter)
+
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    _listeners.append(listener)
+    return queue_handler
@@ -1,60 +1,72 @@
 """
 Middleware for request tracking and centralized logging.
 """
-import uuid
+import os
 import logging
+import threading
 import time
+from contextvars import ContextVar
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
 
+# Bound once at import, called for every request
+_monotonic = time.monotonic
 
-class CorrelationIdMiddleware(MiddlewareMixin):
+# Correlation ID of the request being processed, added to log records by CorrelationIdFilter
+correlation_id_var = ContextVar('correlation_id', default='N/A')
+
+# Random bytes are read in batches and sliced into UUIDs, one buffer per thread
+_RANDOM_BUFFER_SIZE = 4096
+_random = threading.local()
+
+# Response statuses logged as security events
+_SECURITY_STATUSES = frozenset({401, 403})
+
+
+def generate_correlation_id():
+    """
+    Generate random (version 4) UUID string.
+
+    Same format as str(uuid.uuid4()), but random bytes come from a per-thread
+    buffer refilled every 256 ids instead of an os.urandom call per request.
+    """
+    buffer = getattr(_random, 'buffer', None)
+    position = getattr(_random, 'position', _RANDOM_BUFFER_SIZE)
+    if buffer is None or position >= _RANDOM_BUFFER_SIZE:
+        buffer = _random.buffer = os.urandom(_RANDOM_BUFFER_SIZE)
+        position = 0
+    _random.position = position + 16
+
+    value = bytearray(buffer[position:position + 16])
+    value[6] = (value[6] & 0x0f) | 0x40  # version 4
+    value[8] = (value[8] & 0x3f) | 0x80  # RFC 4122 variant
+    h = value.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+class CorrelationIdFilter(logging.Filter):
+    """
+    Logging filter that adds correlation_id of the current request to log records,
+    for use as %(correlation_id)s / {correlation_id} in formatters.
     """
-    Middleware for adding correlation_id to each request.
+
+    def filter(self, record):
+        record.correlation_id = correlation_id_var.get()
+        return True
+
+
+class RequestContextMiddleware(MiddlewareMixin):
+    """
+    Middleware for request context (correlation_id, timing) and request logging.
     
     Correlation ID allows tracking one request through all logs
     in distributed system.
     
     Usage:
-    - Generates unique UUID for each request
-    - Adds correlation_id to response header (X-Correlation-ID)
-    - Adds correlation_id to local logging context
-    """
-    
-    def process_request(self, request):
-        """
-        Generate correlation_id for incoming request.
-        """
-        # Use existing correlation_id from header or generate new one
-        correlation_id = request.headers.get('X-Correlation-ID', str(uuid.uuid4()))
-        
-        # Save in request for use in views
-        request.correlation_id = correlation_id
-        
-        # Save request processing start time
-        request.start_time = time.time()
-        
-        return None
-    
-    def process_response(self, request, response):
-        """
-        Add correlation_id to response headers.
-        """
-        if hasattr(request, 'correlation_id'):
-            response['X-Correlation-ID'] = request.correlation_id
-            
-            # Calculate request processing time
-            if hasattr(request, 'start_time'):
-                duration = time.time() - request.start_time
-                response['X-Response-Time'] = f"{duration:.3f}s"
-        
-        return response
-
-
-class RequestLoggingMiddleware(MiddlewareMixin):
-    """
-    Middleware for logging all HTTP requests.
+    - Takes correlation_id from X-Correlation-ID header or generates new UUID
+    - Adds correlation_id to logging context (see CorrelationIdFilter)
+    - Adds X-Correlation-ID and X-Response-Time response headers
     
     Logs:
     - Request method and path
@@ -62,34 +74,51 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     - Processing time
     - Correlation ID
     - User ID (if authenticated)
+    - Security events: failed sign in / access attempts (401/403) with client IP
     """
     
     def process_request(self, request):
         """
-        Log incoming request.
+        Set up request context and log incoming request.
         Note: Request body is not logged to protect sensitive data (passwords, tokens).
         """
-        correlation_id = getattr(request, 'correlation_id', 'N/A')
-        user_id = request.user.id if request.user.is_authenticated else 'anonymous'
-
+        # Use existing correlation_id from header or generate new one
+        correlation_id = request.headers.get('X-Correlation-ID') or generate_correlation_id()
+        
+        # Save in request for use in views
+        request.correlation_id = correlation_id
+        # Make it available to all log records of this request
+        request._correlation_id_token = correlation_id_var.set(correlation_id)
+        
+        # Save request processing start time
+        request.start_time = _monotonic()
+        
+        # Access logs disabled (e.g. WARNING level in production)
+        if not logger.isEnabledFor(logging.INFO):
+            return None
+        
+        user_id = self._get_user_id(request)
+        
         # Debug: log sessionid cookie presence
-        has_sessionid = 'sessionid' in request.COOKIES
-        sessionid_value = request.COOKIES.get('sessionid', '')[:10] if has_sessionid else 'N/A'
-
+        sessionid = request.COOKIES.get('sessionid')
+        sessionid_value = f"{sessionid[:10]}..." if sessionid is not None else 'N/A'
+        
         logger.info(
-            f"[{correlation_id}] Request: {request.method} {request.path} | User: {user_id} | "
-            f"Session: {sessionid_value}{'...' if has_sessionid else ''}"
+            "Request: %s %s | User: %s | Session: %s",
+            request.method, request.path, user_id, sessionid_value
         )
-
+        
         return None
     
     def process_response(self, request, response):
         """
-        Log request response.
+        Add context headers to response and log it.
         """
-        correlation_id = getattr(request, 'correlation_id', 'N/A')
-        user_id = request.user.id if request.user.is_authenticated else 'anonymous'
-        duration = time.time() - request.start_time if hasattr(request, 'start_time') else 0
+        # process_request always ran for this middleware, attributes are set
+        duration = _monotonic() - request.start_time
+        
+        response['X-Correlation-ID'] = request.correlation_id
+        response['X-Response-Time'] = '%.3fs' % duration
         
         # Determine logging level by status
         if response.status_code >= 500:
@@ -99,11 +128,25 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         else:
             log_level = logging.INFO
         
-        logger.log(
-            log_level,
-            f"[{correlation_id}] Response: {request.method} {request.path} | "
-            f"Status: {response.status_code} | Duration: {duration:.3f}s | User: {user_id}"
-        )
+        # Read again after the view: sign in/sign out replace request.user
+        user_id = self._get_user_id(request)
+        if logger.isEnabledFor(log_level):
+            logger.log(
+                log_level,
+                "Response: %s %s | Status: %s | Duration: %.3fs | User: %s",
+                request.method, request.path, response.status_code, duration, user_id
+            )
+        
+        # Log failed authentication/authorization attempts
+        if response.status_code in _SECURITY_STATUSES:
+            logger.warning(
+                "[SECURITY] Access denied | Status: %s | Method: %s | Path: %s | User: %s | IP: %s",
+                response.status_code, request.method, request.path, user_id,
+                self._get_client_ip(request)
+            )
+        
+        # Reset only after everything for this request has been logged
+        correlation_id_var.reset(request._correlation_id_token)
         
         return response
     
@@ -111,48 +154,22 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         """
         Log unhandled exceptions.
         """
-        correlation_id = getattr(request, 'correlation_id', 'N/A')
-        user_id = request.user.id if request.user.is_authenticated else 'anonymous'
+        user_id = self._get_user_id(request)
         
         logger.exception(
-            f"[{correlation_id}] Exception: {request.method} {request.path} | "
-            f"User: {user_id} | Error: {str(exception)}"
+            "Exception: %s %s | User: %s | Error: %s",
+            request.method, request.path, user_id, exception
         )
         
         return None
-
-
-class SecurityEventMiddleware(MiddlewareMixin):
-    """
-    Middleware for logging security events.
-    
-    Events:
-    - Failed sign in attempts (401/403)
-    - Attempts to access other users data
-    - Suspicious activity
-    """
     
-    def process_response(self, request, response):
+    def _get_user_id(self, request):
         """
-        Log security events based on response status.
+        ID of the request user, 'anonymous' if not authenticated.
+        request.user is resolved lazily once by Django and cached on the request.
         """
-        correlation_id = getattr(request, 'correlation_id', 'N/A')
-        
-        # Log failed authentication/authorization attempts
-        if response.status_code in [401, 403]:
-            user_id = request.user.id if request.user.is_authenticated else 'anonymous'
-            ip_address = self._get_client_ip(request)
-            
-            logger.warning(
-                f"[SECURITY] [{correlation_id}] Access denied | "
-                f"Status: {response.status_code} | "
-                f"Method: {request.method} | "
-                f"Path: {request.path} | "
-                f"User: {user_id} | "
-                f"IP: {ip_address}"
-            )
-        
-        return response
+        user = request.user
+        return user.id if user.is_authenticated else 'anonymous'
     
     def _get_client_ip(self, request):
         """
@@ -160,8 +177,8 @@ class SecurityEventMiddleware(MiddlewareMixin):
         """
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            # First address is the client, the rest are proxies
+            ip = x_forwarded_for.partition(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
-
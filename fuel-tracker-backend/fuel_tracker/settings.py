@@ -85,6 +85,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # 3rd party
     'rest_framework',
     'corsheaders',
@@ -104,9 +105,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # Custom middleware
-    'fuel_tracker.middleware.CorrelationIdMiddleware',
-    'fuel_tracker.middleware.RequestLoggingMiddleware',
-    'fuel_tracker.middleware.SecurityEventMiddleware',
+    'fuel_tracker.middleware.RequestContextMiddleware',
 ]
 
 ROOT_URLCONF = 'fuel_tracker.urls'
@@ -150,15 +149,19 @@ CACHES = {
         "LOCATION": f"redis://{config('REDIS_HOST')}:{config('REDIS_PORT', cast=int)}/1",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Smaller and faster than pickle for the plain values we cache
+            "SERIALIZER": "django_redis.serializers.msgpack.MSGPackSerializer",
         }
     }
 }
 
 AUTH_USER_MODEL = 'users.User'
 
+# Single backend: a fallback ModelBackend would look up the same user again
+# (signup sets username to email) and hash the password a second time
+# on every failed login. EmailBackend inherits ModelBackend permissions.
 AUTHENTICATION_BACKENDS = [
     'users.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend', # Fallback to default backend
 ]
 
 # Password validation
@@ -182,6 +185,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Test passwords do not need PBKDF2 strength, MD5 makes create_user/sign in fast
+if 'test' in sys.argv:
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -346,15 +353,19 @@ LOGGING = {
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {
-            'format': '[{levelname}] {asctime} {name} {module} {funcName}: {message}',
+            'format': '[{levelname}] {asctime} [{correlation_id}] {name} {module} {funcName}: {message}',
             'style': '{',
         },
         'simple': {
-            'format': '[{levelname}] {message}',
+            'format': '[{levelname}] [{correlation_id}] {message}',
             'style': '{',
         },
     },
     'filters': {
+        # Adds correlation_id of the current request to every record
+        'correlation_id': {
+            '()': 'fuel_tracker.middleware.CorrelationIdFilter',
+        },
         'require_debug_false': {
             '()': 'django.utils.log.RequireDebugFalse',
         },
@@ -367,6 +378,7 @@ LOGGING = {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
+            'filters': ['correlation_id'],
         },
         'file': {
             'level': 'INFO',
@@ -375,6 +387,7 @@ LOGGING = {
             'maxBytes': 10 * 1024 * 1024,  # 10 MB
             'backupCount': 5,
             'formatter': 'verbose',
+            'filters': ['correlation_id'],
         },
         'security_file': {
             'level': 'WARNING',
@@ -383,6 +396,7 @@ LOGGING = {
             'maxBytes': 10 * 1024 * 1024,  # 10 MB
             'backupCount': 10,
             'formatter': 'verbose',
+            'filters': ['correlation_id'],
         },
     },
     'loggers': {
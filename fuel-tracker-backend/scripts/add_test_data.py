@@ -10,6 +10,7 @@ import sys
 import django
 from datetime import datetime, timedelta
 import random
+from contextlib import contextmanager
 from decimal import Decimal
 
 # Django setup
@@ -19,11 +20,17 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fuel_tracker.settings')
 django.setup()
 
 from django.contrib.auth import get_user_model
+from django.db import connection, transaction
 from api.models import Vehicle, FuelEntry
 from api.services import FuelEntryMetricsService
 
 User = get_user_model()
 
+# Values generated entries are drawn from
+STATIONS = ('Shell', 'Lukoil', 'Rosneft', 'Gazprom', 'Tatneft', 'BP')
+BRANDS = ('Shell V-Power', 'Lukoil Euro', 'Rosneft Premium', 'Gazprom Neft', 'BP Ultimate', 'Tatneft Premium')
+GRADES = ('92', '95', '98', 'Diesel')
+
 def create_test_user():
     """Create or get test user"""
     user, created = User.objects.get_or_create(
@@ -61,23 +68,47 @@ def create_vehicles(user):
         }
     ]
     
-    vehicles = []
-    for data in vehicles_data:
-        vehicle, created = Vehicle.objects.get_or_create(
-            user=user,
-            name=data['name'],
-            defaults=data
-        )
-        if created:
-            print(f"✅ Created vehicle: {vehicle.name}")
-        else:
-            print(f"✅ Found vehicle: {vehicle.name}")
-        vehicles.append(vehicle)
+    # One INSERT for all vehicles, existing (user, name) pairs are skipped
+    Vehicle.objects.bulk_create(
+        [Vehicle(user=user, **data) for data in vehicles_data],
+        ignore_conflicts=True
+    )
+    
+    names = [data['name'] for data in vehicles_data]
+    vehicles_by_name = {
+        vehicle.name: vehicle
+        for vehicle in Vehicle.objects.filter(user=user, name__in=names).select_related('user')
+    }
+    vehicles = [vehicles_by_name[name] for name in names]
+    for vehicle in vehicles:
+        print(f"✅ Vehicle ready: {vehicle.name}")
     
     return vehicles
 
+@contextmanager
+def fuel_entry_indexes_dropped():
+    """
+    Drop FuelEntry Meta indexes for a bulk load and build them again after it:
+    one bulk index build is cheaper than updating every index on each insert.
+    Unique and foreign key indexes are kept.
+    Use inside transaction.atomic(), so a failed load also restores the indexes.
+    """
+    indexes = FuelEntry._meta.indexes
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(FuelEntry, index)
+    print(f"🔄 Dropped {len(indexes)} fuel entry indexes for bulk load")
+    
+    yield
+    
+    print(f"🔄 Rebuilding {len(indexes)} fuel entry indexes...")
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.add_index(FuelEntry, index)
+
+@transaction.atomic
 def generate_fuel_entries(vehicle, count=5000):
-    """Generate 5000 fuel entry records for the vehicle"""
+    """Generate 5000 fuel entry records for the vehicle (in one transaction)"""
     print(f"🔄 Generating {count} records for {vehicle.name}...")
     
     # Initial values
@@ -85,7 +116,7 @@ def generate_fuel_entries(vehicle, count=5000):
     current_date = datetime.now() - timedelta(days=365)  # Start from a year ago
     
     # Create first entry (baseline)
-    first_entry = FuelEntry.objects.create(
+    first_entry = FuelEntry(
         user=vehicle.user,
         vehicle=vehicle,
         entry_date=current_date.date(),
@@ -97,8 +128,6 @@ def generate_fuel_entries(vehicle, count=5000):
         fuel_grade='95',
         notes='First refuel'
     )
-    
-    # Recalculate metrics for first entry
     FuelEntryMetricsService.calculate_metrics(first_entry)
     first_entry.save()
     
@@ -106,59 +135,56 @@ def generate_fuel_entries(vehicle, count=5000):
     
     # Generate remaining entries
     entries_to_create = []
-    batch_size = 100
+    # Rows per INSERT statement
+    batch_size = int(os.environ.get('FUEL_TRACKER_BULK_BATCH_SIZE', '1000'))
+    
+    # Draw categorical values for all entries at once
+    station_choices = random.choices(STATIONS, k=count)
+    brand_choices = random.choices(BRANDS, k=count)
+    grade_choices = random.choices(GRADES, k=count)
+    
+    user = vehicle.user
+    randint = random.randint
+    rand = random.random
+    cent = Decimal('0.01')
+    previous_entry = first_entry
     
     for i in range(1, count):
         # Random interval between refuels (3-15 days)
-        days_interval = random.randint(3, 15)
+        days_interval = randint(3, 15)
         current_date += timedelta(days=days_interval)
         
         # Random mileage (200-800 km)
-        distance = random.randint(200, 800)
+        distance = randint(200, 800)
         current_odometer += distance
         
-        # Random refuel parameters
-        liters = Decimal(str(round(random.uniform(30.0, 80.0), 2)))
-        price_per_liter = Decimal(str(round(random.uniform(40.0, 50.0), 2)))
+        # Random refuel parameters, drawn as whole cents (no float -> str -> Decimal)
+        liters = Decimal(3000 + int(rand() * 5001)) * cent  # 30.00-80.00
+        price_per_liter = Decimal(4000 + int(rand() * 1001)) * cent  # 40.00-50.00
         total_amount = liters * price_per_liter
         
-        stations = ['Shell', 'Lukoil', 'Rosneft', 'Gazprom', 'Tatneft', 'BP']
-        brands = ['Shell V-Power', 'Lukoil Euro', 'Rosneft Premium', 'Gazprom Neft', 'BP Ultimate', 'Tatneft Premium']
-        grades = ['92', '95', '98', 'Diesel']
-        
         entry = FuelEntry(
-            user=vehicle.user,
+            user=user,
             vehicle=vehicle,
             entry_date=current_date.date(),
             odometer=current_odometer,
             liters=liters,
             total_amount=total_amount,
-            station_name=random.choice(stations),
-            fuel_brand=random.choice(brands),
-            fuel_grade=random.choice(grades),
+            station_name=station_choices[i],
+            fuel_brand=brand_choices[i],
+            fuel_grade=grade_choices[i],
             notes=f'Refuel #{i+1}' if i % 100 == 0 else ''
         )
         
-        entries_to_create.append(entry)
+        # Previous entry is known, metrics are ready before insert
+        FuelEntryMetricsService.calculate_metrics(entry, previous_entry)
+        previous_entry = entry
         
-        # Create in batches for performance
-        if len(entries_to_create) >= batch_size:
-            FuelEntry.objects.bulk_create(entries_to_create, batch_size)
-            print(f"✅ Created {len(entries_to_create)} entries (total: {i+1})")
-            entries_to_create = []
-    
-    # Create remaining entries
-    if entries_to_create:
-        FuelEntry.objects.bulk_create(entries_to_create, batch_size)
-        print(f"✅ Created {len(entries_to_create)} entries (total: {count})")
-    
-    # Recalculate metrics for all entries
-    print(f"🔄 Recalculating metrics for {vehicle.name}...")
-    entries = FuelEntry.objects.filter(vehicle=vehicle).order_by('entry_date')
+        entries_to_create.append(entry)
     
-    for entry in entries:
-        FuelEntryMetricsService.calculate_metrics(entry)
-        entry.save()
+    # bulk_create splits the list into batch_size INSERTs
+    FuelEntry.objects.bulk_create(entries_to_create, batch_size=batch_size)
+    print(f"✅ Created {len(entries_to_create)} entries (total: {count})")
     
     print(f"✅ Completed for {vehicle.name}")
 
@@ -173,9 +199,10 @@ def main():
         # Create vehicles
         vehicles = create_vehicles(user)
         
-        # Generate entries for each vehicle
-        for vehicle in vehicles:
-            generate_fuel_entries(vehicle, 5000)
+        # Generate entries for each vehicle, indexes are built once at the end
+        with transaction.atomic(), fuel_entry_indexes_dropped():
+            for vehicle in vehicles:
+                generate_fuel_entries(vehicle, 5000)
         
         # Statistics
         total_vehicles = Vehicle.objects.filter(user=user).count()
@@ -2,6 +2,7 @@
 """
 Script for checking user statistics.
 Run: python manage.py shell < scripts/check_stats.py
+Pass --verbose (when run directly) to list every fuel entry.
 """
 import os
 import sys
@@ -12,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fuel_tracker.settings')
 django.setup()
 
+from django.db.models import Count, Max, Q, Sum
 from users.models import User
 from api.models import Vehicle, FuelEntry
 from api.services import StatisticsService
@@ -24,17 +26,26 @@ except User.DoesNotExist:
     print("User anton@mail.ru not found")
     sys.exit(1)
 
-# Get user vehicles
-vehicles = Vehicle.objects.filter(user=user)
-print(f"\nUser vehicles: {vehicles.count()}")
+# Get user vehicles (loaded once, reused by the manual check below)
+vehicles = list(Vehicle.objects.filter(user=user).only('id', 'name', 'initial_odometer'))
+print(f"\nUser vehicles: {len(vehicles)}")
 for vehicle in vehicles:
     print(f"  - {vehicle.name} (ID: {vehicle.id}, initial_odometer: {vehicle.initial_odometer} km)")
 
 # Get fuel entries
 entries = FuelEntry.objects.filter(user=user).order_by('entry_date', 'created_at')
 print(f"\nFuel entries: {entries.count()}")
-for entry in entries:
-    print(f"  - {entry.entry_date}: {entry.odometer} km, {entry.liters} L, ${entry.total_amount}")
+if '--verbose' in sys.argv:
+    # Stream rows with only the printed fields
+    listed_entries = entries.only('entry_date', 'odometer', 'liters', 'total_amount')
+    # One write per chunk instead of one print per entry
+    lines = []
+    for entry in listed_entries.iterator(chunk_size=2000):
+        lines.append(f"  - {entry.entry_date}: {entry.odometer} km, {entry.liters} L, ${entry.total_amount}\n")
+        if len(lines) >= 2000:
+            sys.stdout.write(''.join(lines))
+            lines.clear()
+    sys.stdout.write(''.join(lines))
 
 # Calculate statistics for 30 days
 stats = StatisticsService.calculate_dashboard_statistics(user.id, period_type='30d')
@@ -58,24 +69,46 @@ print("\n" + "="*50)
 print("MANUAL CALCULATION CHECK")
 print("="*50)
 
+# Per vehicle aggregates in one grouped query
+vehicle_aggregates = {
+    row['vehicle_id']: row
+    for row in FuelEntry.objects.filter(user=user).values('vehicle_id').annotate(
+        max_odometer=Max('odometer'),
+        total_amount=Sum('total_amount'),
+        total_liters=Sum('liters'),
+        entry_count=Count('id'),
+    ).order_by()
+}
+
 # For each vehicle Calculate distance
 total_distance_manual = 0
 for vehicle in vehicles:
-    vehicle_entries = entries.filter(vehicle=vehicle)
-    if vehicle_entries.exists():
-        max_odometer = max(e.odometer for e in vehicle_entries)
+    vehicle_aggregate = vehicle_aggregates.get(vehicle.id)
+    if vehicle_aggregate:
+        max_odometer = vehicle_aggregate['max_odometer']
         distance = max_odometer - vehicle.initial_odometer
         total_distance_manual += distance
         print(f"\n{vehicle.name}:")
         print(f"  - initial_odometer: {vehicle.initial_odometer} km")
         print(f"  - max_odometer: {max_odometer} km")
         print(f"  - distance: {distance} km")
+        print(f"  - entries: {vehicle_aggregate['entry_count']}, "
+              f"spent: ${vehicle_aggregate['total_amount']}, liters: {vehicle_aggregate['total_liters']} L")
 
 print(f"\nTotal Distance (manual): {total_distance_manual} km")
 
+# Totals are summed by the database
+totals = entries.aggregate(
+    total_cost=Sum('total_amount'),
+    total_liters=Sum('liters'),
+    # Only entries with metrics count for average consumption
+    metric_liters=Sum('liters', filter=Q(distance_since_last__isnull=False, consumption_l_100km__isnull=False)),
+    metric_distance=Sum('distance_since_last', filter=Q(consumption_l_100km__isnull=False)),
+)
+
 # Total cost and liters
-total_cost = sum(e.total_amount for e in entries)
-total_liters = sum(e.liters for e in entries)
+total_cost = totals['total_cost'] or 0
+total_liters = totals['total_liters'] or 0
 print(f"Total Cost (manual): ${total_cost}")
 print(f"Total Liters (manual): {total_liters} L")
 
@@ -89,10 +122,9 @@ avg_distance_per_day = total_distance_manual / 30 if total_distance_manual > 0 e
 print(f"Average Distance/Day (manual, 30d): {avg_distance_per_day:.1f} km/day")
 
 # For average consumption calculation we need entries with metrics
-entries_with_metrics = [e for e in entries if e.distance_since_last is not None and e.consumption_l_100km is not None]
-if entries_with_metrics:
-    total_fuel_for_consumption = sum(e.liters for e in entries_with_metrics)
-    total_distance_for_consumption = sum(e.distance_since_last for e in entries_with_metrics)
+if totals['metric_liters'] is not None:
+    total_fuel_for_consumption = totals['metric_liters']
+    total_distance_for_consumption = totals['metric_distance']
     avg_consumption = (total_fuel_for_consumption / total_distance_for_consumption * 100) if total_distance_for_consumption > 0 else 0
     print(f"Average Consumption (manual): {avg_consumption:.1f} L/100km")
 
@@ -14,6 +14,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fuel_tracker.settings')
 django.setup()
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from api.models import Vehicle, FuelEntry
 
 User = get_user_model()
@@ -23,13 +24,13 @@ def clear_user_data():
     try:
         user = User.objects.get(email='anton@mail.ru')
         
-        # Delete fuel entries
-        fuel_entries_count = FuelEntry.objects.filter(user=user).count()
-        FuelEntry.objects.filter(user=user).delete()
-        
-        # Delete vehicles
-        vehicles_count = Vehicle.objects.filter(user=user).count()
-        Vehicle.objects.filter(user=user).delete()
+        # delete() returns number of deleted rows, no separate count() needed
+        with transaction.atomic():
+            # Delete fuel entries
+            fuel_entries_count, _ = FuelEntry.objects.filter(user=user).delete()
+            
+            # Delete vehicles (their entries are already gone, so nothing cascades)
+            vehicles_count, _ = Vehicle.objects.filter(user=user).delete()
         
         print(f"✅ Cleared:")
         print(f"   - Fuel entries: {fuel_entries_count}")
@@ -1,19 +1,39 @@
+from functools import lru_cache
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from django.contrib.auth.hashers import make_password
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+
+
+@lru_cache(maxsize=None)
+def _dummy_password_hash(algorithm):
+    # Hashed once per hasher on first use, not at import (hashing takes ~100ms).
+    # Keyed by algorithm: check_password rejects hashes of hashers no longer
+    # in PASSWORD_HASHERS (e.g. when tests override it).
+    return make_password('dummy-password', hasher=algorithm)
+
 
 class EmailBackend(ModelBackend):
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        UserModel = get_user_model()
-        try:
-            # Email comes in username field since we use it for sign in
-            user = UserModel.objects.get(email=username)
-        except UserModel.DoesNotExist:
-            # Protection against timing attack: perform dummy hash operation
-            # so response time is same for existing/non-existing emails
-            make_password(password)
+    def authenticate(self, request, username=None, password=None, user=None, **kwargs):
+        """
+        user: account already fetched by the caller for this email (optional),
+        saves looking it up again
+        """
+        # Nothing to check (e.g. called with other credentials), skip hashing
+        if username is None or password is None:
             return None
 
-        if user.check_password(password):
+        if user is None or user.email != username:
+            UserModel = get_user_model()
+            try:
+                # Email comes in username field since we use it for sign in
+                user = UserModel.objects.get(email=username)
+            except UserModel.DoesNotExist:
+                # Protection against timing attack: check password against dummy hash
+                # so response time is same for existing/non-existing emails
+                check_password(password, _dummy_password_hash(get_hasher().algorithm))
+                return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
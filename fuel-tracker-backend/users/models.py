@@ -13,6 +13,17 @@ class User(AbstractUser):
     failed_login_attempts = models.IntegerField(default=0, help_text="Number of consecutive failed login attempts")
     locked_until = models.DateTimeField(null=True, blank=True, help_text="Account locked until this timestamp")
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Email is the sign in identifier; enforced by the database so signup
+            # needs no SELECT before INSERT. Blank emails (e.g. admin users) are not unique.
+            models.UniqueConstraint(
+                fields=['email'],
+                condition=~models.Q(email=''),
+                name='users_user_email_unique',
+            ),
+        ]
+
     def __str__(self):
         return self.email
     
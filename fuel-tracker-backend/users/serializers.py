@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
 User = get_user_model()
@@ -29,22 +30,18 @@ class UserSignUpResponseSerializer(serializers.ModelSerializer):
         fields = ('id', 'email')
 
 class UserCreateSerializer(serializers.ModelSerializer):
+    # Declared explicitly so no UniqueValidator query runs; uniqueness is
+    # enforced by the users_user_email_unique constraint on insert
+    email = serializers.EmailField(max_length=254)
+
+    # Error message does not reveal email existence (anti-enumeration)
+    DUPLICATE_EMAIL_MESSAGE = "If this email is not already registered, you will receive a confirmation email."
+
     class Meta:
         model = User
         fields = ('email', 'password')
         extra_kwargs = {'password': {'write_only': True}}
 
-    def validate_email(self, value):
-        """
-        Check email uniqueness.
-        Error message does not reveal email existence (anti-enumeration).
-        """
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError(
-                "If this email is not already registered, you will receive a confirmation email."
-            )
-        return value
-
     def validate(self, data):
         # Apply standard Django validators to password
         password = data.get('password')
@@ -52,11 +49,14 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return super().validate(data)
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['email'],
-            email=validated_data['email'],
-            password=validated_data['password']
-        )
+        try:
+            # Savepoint, so a duplicate does not break an outer transaction
+            with transaction.atomic():
+                # Other fields (e.g. locale passed to save() by the view) are set on insert
+                user = User.objects.create_user(username=validated_data['email'], **validated_data)
+        except IntegrityError:
+            # Email (or username, which is the same email) already registered
+            raise serializers.ValidationError({'email': [self.DUPLICATE_EMAIL_MESSAGE]})
         return user
 
 class LoginSerializer(serializers.Serializer):
@@ -64,8 +64,15 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        # EmailBackend expects username (not email) as parameter
-        user = authenticate(username=data.get('email'), password=data.get('password'))
+        # EmailBackend expects username (not email) as parameter; an account
+        # already fetched by the view is passed on so it is not looked up again.
+        # Going through authenticate() keeps backend checks and user_login_failed.
+        user = authenticate(
+            self.context.get('request'),
+            username=data.get('email'),
+            password=data.get('password'),
+            user=self.context.get('prefetched_user'),
+        )
         if user and user.is_active:
             return {'user': user}
         raise serializers.ValidationError("Incorrect Credentials")
@@ -1,10 +1,13 @@
 """
 Tests for authentication and user profile
 """
+from unittest import mock
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
 from rest_framework.test import APITestCase
 from rest_framework import status
+from .views import AuthenticationThrottle
 
 User = get_user_model()
 
@@ -53,7 +56,7 @@ class AuthSignUpTestCase(APITestCase):
         response = self.client.post('/api/v1/auth/signup', data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('email', str(response.data).lower())
+        self.assertIn('email', [error['field'] for error in response.data['errors']])
     
     def test_signup_weak_password(self):
         """AUTH-003: Registration with invalid password (shorter than 8 characters)"""
@@ -65,7 +68,8 @@ class AuthSignUpTestCase(APITestCase):
         response = self.client.post('/api/v1/auth/signup', data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('password', str(response.data).lower())
+        # Password validators raise non-field errors, check the messages
+        self.assertTrue(any('password' in error['detail'].lower() for error in response.data['errors']))
 
 
 class AuthSignInTestCase(APITestCase):
@@ -73,9 +77,10 @@ class AuthSignInTestCase(APITestCase):
     Tests for sign in (AUTH-004, AUTH-005)
     """
     
-    def setUp(self):
-        """Create test user"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create test user (once per class)"""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='TestPass123'
@@ -121,6 +126,44 @@ class AuthSignInTestCase(APITestCase):
         
         # DRF returns 400 for ValidationError (this is correct behavior)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_signin_wrong_password_sends_login_failed_signal(self):
+        """Wrong password for an existing account goes through authenticate()"""
+        failed_logins = []
+        
+        def receiver(sender, credentials, request=None, **kwargs):
+            failed_logins.append(credentials['username'])
+        
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        
+        with mock.patch.object(AuthenticationThrottle, 'allow_request', return_value=True):
+            self.client.post('/api/v1/auth/signin', {
+                'email': 'test@example.com',
+                'password': 'WrongPassword'
+            })
+        
+        self.assertEqual(failed_logins, ['test@example.com'])
+    
+    def test_signin_locks_account_after_5_failed_attempts(self):
+        """Account is locked after 5 wrong passwords"""
+        data = {
+            'email': 'test@example.com',
+            'password': 'WrongPassword'
+        }
+        
+        # Rate limit (5/min per IP) would answer the 6th request first
+        with mock.patch.object(AuthenticationThrottle, 'allow_request', return_value=True):
+            for _ in range(5):
+                self.client.post('/api/v1/auth/signin', data)
+            response = self.client.post('/api/v1/auth/signin', data)
+        
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.data['errors'][0]['code'], 'account_locked')
+        
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_login_attempts, 5)
+        self.assertIsNotNone(self.user.locked_until)
 
 
 class AuthSignOutTestCase(APITestCase):
@@ -128,13 +171,17 @@ class AuthSignOutTestCase(APITestCase):
     Tests for sign out from system (AUTH-006)
     """
     
-    def setUp(self):
-        """Create and authorize user"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create user (once per class)"""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='TestPass123'
         )
+    
+    def setUp(self):
+        """Authorize user"""
         self.client.force_authenticate(user=self.user)
     
     def test_signout_successful(self):
@@ -149,9 +196,9 @@ class AuthSignOutTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         
         # Check that session is ended
-        # Create new client without authentication
-        new_client = self.client_class()
-        profile_response = new_client.get('/api/v1/users/me')
+        # Drop forced authentication, same client keeps its (flushed) session
+        self.client.force_authenticate(user=None)
+        profile_response = self.client.get('/api/v1/users/me')
         self.assertIn(profile_response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
 
 
@@ -160,19 +207,21 @@ class UserProfileTestCase(APITestCase):
     Tests for user profile (PROF-001, PROF-002, PROF-003)
     """
     
-    def setUp(self):
-        """Create and authorize user"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create user (once per class)"""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
-            password='TestPass123'
+            password='TestPass123',
+            preferred_currency='USD',
+            preferred_distance_unit='km',
+            preferred_volume_unit='L',
+            timezone='UTC',
         )
-        self.user.preferred_currency = 'USD'
-        self.user.preferred_distance_unit = 'km'
-        self.user.preferred_volume_unit = 'L'
-        self.user.timezone = 'UTC'
-        self.user.save()
-        
+    
+    def setUp(self):
+        """Authorize user"""
         self.client.force_authenticate(user=self.user)
     
     def test_get_profile(self):
@@ -216,12 +265,12 @@ class UserProfileTestCase(APITestCase):
         response = self.client.patch('/api/v1/users/me', data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('preferred_distance_unit', str(response.data).lower())
+        self.assertIn('preferred_distance_unit', [error['field'] for error in response.data['errors']])
     
     def test_profile_unauthenticated(self):
         """Attempt to get profile without authentication"""
-        # Create new client without authentication
-        new_client = self.client_class()
-        response = new_client.get('/api/v1/users/me')
+        # Drop forced authentication set up in setUp
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/v1/users/me')
         
         self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
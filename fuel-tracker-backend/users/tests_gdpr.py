@@ -17,18 +17,19 @@ class GDPRExportTestCase(APITestCase):
     Tests for user data export endpoint
     """
     
-    def setUp(self):
-        """Create test data"""
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data (once per class)"""
         # Create user
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
         
         # Create vehicle
-        self.vehicle = Vehicle.objects.create(
-            user=self.user,
+        cls.vehicle = Vehicle.objects.create(
+            user=cls.user,
             name='Test Car',
             make='Toyota',
             model='Camry',
@@ -37,9 +38,9 @@ class GDPRExportTestCase(APITestCase):
         )
         
         # Create Fuel entry
-        self.entry = FuelEntry.objects.create(
-            vehicle=self.vehicle,
-            user=self.user,
+        cls.entry = FuelEntry.objects.create(
+            vehicle=cls.vehicle,
+            user=cls.user,
             entry_date=date.today(),
             odometer=10000,
             station_name='Shell',
@@ -60,8 +61,8 @@ class GDPRExportTestCase(APITestCase):
         self.assertIn('attachment', response['Content-Disposition'])
         self.assertIn('.csv', response['Content-Disposition'])
         
-        # Check that CSV contains user data
-        content = response.content.decode('utf-8')
+        # Check that CSV contains user data (streamed, so read it once)
+        content = b''.join(response.streaming_content).decode()
         self.assertIn('USER PROFILE', content)
         self.assertIn(self.user.email, content)
         self.assertIn('VEHICLES', content)
@@ -91,7 +92,7 @@ class GDPRExportTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        content = response.content.decode('utf-8')
+        content = b''.join(response.streaming_content).decode()
         self.assertIn('USER PROFILE', content)
         self.assertIn('No vehicles', content)
         self.assertIn('No fuel entries', content)
@@ -100,18 +101,22 @@ class GDPRExportTestCase(APITestCase):
 class GDPRDeleteAccountTestCase(APITestCase):
     """
     Tests for account deletion endpoint
+    
+    APITestCase is a TestCase: each test, including its cascade deletes, is rolled back
+    to a savepoint. Do not switch to TransactionTestCase, it truncates all tables per test.
     """
     
-    def setUp(self):
-        """Create test data"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create test data (once per class)"""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
         
-        self.vehicle = Vehicle.objects.create(
-            user=self.user,
+        cls.vehicle = Vehicle.objects.create(
+            user=cls.user,
             name='Test Car',
             make='Toyota',
             model='Camry',
@@ -119,9 +124,9 @@ class GDPRDeleteAccountTestCase(APITestCase):
             fuel_type='Gasoline'
         )
         
-        self.entry = FuelEntry.objects.create(
-            vehicle=self.vehicle,
-            user=self.user,
+        cls.entry = FuelEntry.objects.create(
+            vehicle=cls.vehicle,
+            user=cls.user,
             entry_date=date.today(),
             odometer=10000,
             station_name='Shell',
@@ -172,9 +177,9 @@ class GDPRDeleteAccountTestCase(APITestCase):
             fuel_type='Gasoline'
         )
         
-        # Create several more entries
-        for i in range(5):
-            FuelEntry.objects.create(
+        # Create several more entries (one INSERT)
+        FuelEntry.objects.bulk_create([
+            FuelEntry(
                 vehicle=vehicle2,
                 user=self.user,
                 entry_date=date.today() - timedelta(days=i),
@@ -185,6 +190,8 @@ class GDPRDeleteAccountTestCase(APITestCase):
                 liters=Decimal('45.00'),
                 total_amount=Decimal('70.00')
             )
+            for i in range(5)
+        ])
         
         self.client.force_authenticate(user=self.user)
         
@@ -195,7 +202,7 @@ class GDPRDeleteAccountTestCase(APITestCase):
         entries_count = FuelEntry.objects.filter(user=self.user).count()
         
         self.assertEqual(vehicles_count, 2)
-        self.assertEqual(entries_count, 6)  # 1 from setUp + 5 new
+        self.assertEqual(entries_count, 6)  # 1 from setUpTestData + 5 new
         
         # Delete account
         response = self.client.delete('/api/v1/users/me/delete')
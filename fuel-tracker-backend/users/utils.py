@@ -1,4 +1,6 @@
 import logging
+import re
+from functools import lru_cache
 from typing import Dict, Tuple
 
 logger = logging.getLogger(__name__)
@@ -81,9 +83,43 @@ LOCALE_MAPPING = {
 }
 
 
+# Country guessed for a language without country code (e.g. "de" -> DE)
+LANGUAGE_TO_COUNTRY = {
+    'en': 'US',
+    'de': 'DE',
+    'fr': 'FR',
+    'es': 'ES',
+    'it': 'IT',
+    'pt': 'PT',
+    'ru': 'RU',
+    'ja': 'JP',
+    'zh': 'CN',
+    'ko': 'KR',
+    'ar': 'SA',
+    'nl': 'NL',
+    'pl': 'PL',
+    'tr': 'TR',
+}
+
+# Bare language codes (lowercase) resolve in the same table as country codes
+# (uppercase), so parsing needs a single lookup. Languages of unmapped
+# countries (e.g. "ru") get the defaults, as for an unknown country.
+LOCALE_MAPPING.update({
+    language: LOCALE_MAPPING.get(country, ('USD', 'UTC'))
+    for language, country in LANGUAGE_TO_COUNTRY.items()
+})
+
+
+# First locale of Accept-Language: language and optional region ("en-US", "de_DE", "fr", "es-419")
+_LOCALE_RE = re.compile(r'\s*([A-Za-z]+)(?:[-_]([A-Za-z0-9]+))?')
+
+
+@lru_cache(maxsize=512)
 def get_locale_from_accept_language(accept_language: str) -> Tuple[str, str]:
     """
     Parse Accept-Language header and determine timezone and currency.
+    Results are cached per header value (few distinct values in practice),
+    detection is logged only when a value is parsed for the first time.
     
     Args:
         accept_language: Accept-Language header value (e.g., "en-US,en;q=0.9,ru;q=0.8")
@@ -96,53 +132,34 @@ def get_locale_from_accept_language(accept_language: str) -> Tuple[str, str]:
     
     # Parse Accept-Language header
     # Format: "en-US,en;q=0.9,de;q=0.8"
-    # We take the first (highest priority) locale
-    try:
-        # Split by comma and get first locale
-        first_locale = accept_language.split(',')[0].strip()
-        
-        # Remove quality factor if present (e.g., "en-US;q=0.9" -> "en-US")
-        locale = first_locale.split(';')[0].strip()
-        
-        # Extract country code (e.g., "en-US" -> "US", "de-DE" -> "DE")
-        if '-' in locale:
-            country_code = locale.split('-')[1].upper()
-        elif '_' in locale:
-            country_code = locale.split('_')[1].upper()
-        else:
-            # No country code, try to guess from language
-            # en -> US, de -> DE, fr -> FR, etc.
-            language = locale.lower()
-            country_mapping = {
-                'en': 'US',
-                'de': 'DE',
-                'fr': 'FR',
-                'es': 'ES',
-                'it': 'IT',
-                'pt': 'PT',
-                'ru': 'RU',
-                'ja': 'JP',
-                'zh': 'CN',
-                'ko': 'KR',
-                'ar': 'SA',
-                'nl': 'NL',
-                'pl': 'PL',
-                'tr': 'TR',
-            }
-            country_code = country_mapping.get(language, 'US')
-        
-        # Look up currency and timezone
-        if country_code in LOCALE_MAPPING:
-            currency, timezone = LOCALE_MAPPING[country_code]
-            logger.info(f"Detected locale from Accept-Language: {locale} -> {country_code} -> {currency}, {timezone}")
-            return (currency, timezone)
-        else:
-            logger.warning(f"Country code {country_code} not found in mapping, using defaults")
-            return ('USD', 'UTC')
-            
-    except Exception as e:
-        logger.error(f"Error parsing Accept-Language header '{accept_language}': {e}")
-        return ('USD', 'UTC')
+    # We take the first (highest priority) locale, the regex stops at ',' / ';'
+    match = _LOCALE_RE.match(accept_language)
+    if match is None:
+        # No language tag (e.g. "*"), guess as for unknown language
+        locale, language, region = accept_language.strip(), '', None
+    else:
+        locale = match.group(0).strip()
+        language, region = match.groups()
+    
+    # Country code ("en-US" -> "US") or, without one, the language ("de" -> "de")
+    country_code = region.upper() if region else language.lower()
+    
+    # Look up currency and timezone
+    locale_info = LOCALE_MAPPING.get(country_code)
+    if locale_info is None and not region:
+        # Unknown language, guess US
+        country_code = 'US'
+        locale_info = LOCALE_MAPPING['US']
+    if locale_info is not None:
+        currency, timezone = locale_info
+        logger.info(
+            "Detected locale from Accept-Language: %s -> %s -> %s, %s",
+            locale, country_code, currency, timezone
+        )
+        return (currency, timezone)
+    
+    logger.warning("Country code %s not found in mapping, using defaults", country_code)
+    return ('USD', 'UTC')
 
 
 def get_locale_from_request(request) -> Tuple[str, str]:
@@ -171,7 +188,7 @@ def get_locale_from_request(request) -> Tuple[str, str]:
             # Validate that it's a reasonable timezone string
             if '/' in browser_timezone and len(browser_timezone) < 50:
                 timezone = browser_timezone
-                logger.info(f"Using browser-provided timezone: {timezone}")
+                logger.info("Using browser-provided timezone: %s", timezone)
         
         return (currency, timezone)
     
@@ -2,11 +2,13 @@ import csv
 import logging
 from io import StringIO
 from datetime import timedelta
+from functools import lru_cache
 from django.contrib.auth import login, logout
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.db import transaction
+from django.db.models import Case, F, Value, When
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -20,6 +22,12 @@ from .models import User
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _parse_throttle_rate(rate):
+    # parse_rate does not use the instance
+    return AnonRateThrottle.parse_rate(None, rate)
+
+
 class AuthenticationThrottle(AnonRateThrottle):
     """
     Custom throttle for authentication endpoints
@@ -27,6 +35,18 @@ class AuthenticationThrottle(AnonRateThrottle):
     """
     scope = 'auth'
 
+    def parse_rate(self, rate):
+        # A throttle is created per request, the rate string from settings
+        # is parsed once per process instead
+        return _parse_throttle_rate(rate)
+
+    def get_cache_key(self, request, view):
+        # Authenticated requests are not throttled, as in AnonRateThrottle
+        if request.user and request.user.is_authenticated:
+            return None
+        # Shorter than DRF's "throttle_auth_<ip>", one key per client IP
+        return f"t:a:{self.get_ident(request)}"
+
 
 @extend_schema(
     summary="Sign up",
@@ -48,15 +68,13 @@ class SignUpView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
         
-        # Determine locale (currency and timezone) from browser headers
+        # Determine locale (currency and timezone) from browser headers,
+        # set on the new user in the same INSERT
         currency, timezone = get_locale_from_request(request)
-        user.preferred_currency = currency
-        user.timezone = timezone
-        user.save()
+        user = serializer.save(preferred_currency=currency, timezone=timezone)
         
-        logger.info(f"New user registered: {user.email}, locale: {currency}, {timezone}")
+        logger.info("New user registered: %s, locale: %s, %s", user.email, currency, timezone)
 
         # Explicitly specify which backend was used for authentication
         # This is necessary since we have multiple backends
@@ -85,40 +103,42 @@ class SignInView(generics.GenericAPIView):
         email = request.data.get('email')
         
         # Check account lockout before validation
-        try:
-            user = User.objects.get(email=email)
-            
-            # If account is locked
-            if user.locked_until and user.locked_until > timezone.now():
-                remaining_minutes = int((user.locked_until - timezone.now()).total_seconds() / 60)
-                logger.warning(
-                    f"[SECURITY] Locked account login attempt: {email} | "
-                    f"IP: {self.get_client_ip(request)} | "
-                    f"Remaining: {remaining_minutes} minutes"
-                )
-                return Response({
-                    'errors': [{
-                        'status': '429',
-                        'code': 'account_locked',
-                        'detail': f'Account temporarily locked. Try again in {remaining_minutes} minutes.'
-                    }]
-                }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        # (the same user is reused to count a failed attempt below)
+        known_user = User.objects.filter(email=email).first() if email else None
         
-        except User.DoesNotExist:
-            pass  # Continue to normal validation
+        # If account is locked
+        now = timezone.now()
+        if known_user and known_user.locked_until and known_user.locked_until > now:
+            remaining_minutes = int((known_user.locked_until - now).total_seconds() / 60)
+            logger.warning(
+                "[SECURITY] Locked account login attempt: %s | IP: %s | Remaining: %d minutes",
+                email, self.get_client_ip(request), remaining_minutes
+            )
+            return Response({
+                'errors': [{
+                    'status': '429',
+                    'code': 'account_locked',
+                    'detail': f'Account temporarily locked. Try again in {remaining_minutes} minutes.'
+                }]
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
         
-        # Validation credentials
-        serializer = self.get_serializer(data=request.data)
+        # Validation credentials; the fetched user is handed to authenticate()
+        # via the serializer, so EmailBackend checks it without a second lookup
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), 'prefetched_user': known_user},
+        )
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
             
-            # Successful login - reset failed attempts
-            user.failed_login_attempts = 0
-            user.locked_until = None
-            user.save(update_fields=['failed_login_attempts', 'locked_until'])
+            # Successful login - reset failed attempts (no UPDATE if nothing to reset)
+            if user.failed_login_attempts or user.locked_until:
+                user.failed_login_attempts = 0
+                user.locked_until = None
+                user.save(update_fields=['failed_login_attempts', 'locked_until'])
             
-            logger.info(f"Successful login: {user.email}")
+            logger.info("Successful login: %s", user.email)
             
             # Explicitly specify which backend was used for authentication
             user.backend = 'users.backends.EmailBackend'
@@ -127,41 +147,59 @@ class SignInView(generics.GenericAPIView):
         
         else:
             # Failed attempt - increment failed attempts
-            try:
-                user = User.objects.get(email=email)
-                user.failed_login_attempts += 1
-                
-                # Lock after 5 failed attempts for 15 minutes
-                if user.failed_login_attempts >= 5:
-                    user.locked_until = timezone.now() + timedelta(minutes=15)
-                    logger.warning(
-                        f"[SECURITY] Account locked after 5 failed attempts: {email} | "
-                        f"IP: {self.get_client_ip(request)}"
-                    )
-                
-                user.save(update_fields=['failed_login_attempts', 'locked_until'])
+            if known_user is not None:
+                # Incremented in the DB so concurrent attempts are all counted.
+                # Lock after 5 failed attempts for 15 minutes (the condition
+                # sees the value before the increment)
+                User.objects.filter(pk=known_user.pk).update(
+                    failed_login_attempts=F('failed_login_attempts') + 1,
+                    locked_until=Case(
+                        When(failed_login_attempts__gte=4, then=Value(now + timedelta(minutes=15))),
+                        default=F('locked_until'),
+                    ),
+                )
+                # Count as seen by this request, for logs only
+                failed_attempts = known_user.failed_login_attempts + 1
+                locked = failed_attempts >= 5
                 
+                # One record per failed attempt, lockout included; fields are
+                # also passed as extra for structured handlers
+                ip = self.get_client_ip(request)
                 logger.warning(
-                    f"[SECURITY] Failed login attempt ({user.failed_login_attempts}/5): {email} | "
-                    f"IP: {self.get_client_ip(request)}"
+                    "[SECURITY] Failed login attempt (%d/5): %s | IP: %s%s",
+                    failed_attempts, email, ip,
+                    " | Account locked for 15 minutes" if locked else "",
+                    extra={
+                        'event': 'login_failed',
+                        'email': email,
+                        'ip': ip,
+                        'attempts': failed_attempts,
+                        'locked': locked,
+                    },
                 )
             
-            except User.DoesNotExist:
+            else:
                 # Do not reveal email existence
                 logger.warning(
-                    f"[SECURITY] Login attempt for non-existent user: {email} | "
-                    f"IP: {self.get_client_ip(request)}"
+                    "[SECURITY] Login attempt for non-existent user: %s | IP: %s",
+                    email, self.get_client_ip(request)
                 )
             
             return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
     
     def get_client_ip(self, request):
-        """Get client IP address"""
+        """Get client IP address (computed once per request)"""
+        try:
+            return request._client_ip
+        except AttributeError:
+            pass
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            # First address only, no need to split the whole proxy chain
+            ip = x_forwarded_for.partition(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
+        request._client_ip = ip
         return ip
 
 @extend_schema(
@@ -203,6 +241,20 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return UserSerializer
 
 
+# Rows fetched per DB round-trip while streaming the export
+EXPORT_CHUNK_SIZE = 2000
+
+# Columns written to the export, other columns are not fetched
+VEHICLE_EXPORT_FIELDS = (
+    'id', 'name', 'make', 'model', 'year', 'fuel_type', 'is_active', 'created_at', 'updated_at',
+)
+FUEL_EXPORT_FIELDS = (
+    'id', 'vehicle__name', 'entry_date', 'odometer', 'station_name', 'fuel_brand', 'fuel_grade',
+    'liters', 'total_amount', 'unit_price', 'distance_since_last',
+    'consumption_l_100km', 'cost_per_km', 'notes', 'created_at', 'updated_at',
+)
+
+
 @extend_schema(
     summary="Export user data (GDPR)",
     description="Export all user data in CSV format. Includes user profile, vehicles, and fuel entries. "
@@ -228,36 +280,47 @@ def export_user_data(request):
     """
     user = request.user
     
-    logger.info(f"User {user.id} ({user.email}) requested data export")
+    logger.info("User %s (%s) requested data export", user.id, user.email)
     
-    # Create CSV in memory
+    # CSV is streamed in chunks: rows are written in batches of
+    # EXPORT_CHUNK_SIZE (one DB fetch each) and the buffer is sent and
+    # emptied after every batch, instead of building the whole file in memory
     output = StringIO()
     writer = csv.writer(output)
     
-    # Section 1: User profile
-    writer.writerow(['=== USER PROFILE ==='])
-    writer.writerow(['Field', 'Value'])
-    writer.writerow(['ID', user.id])
-    writer.writerow(['email', user.email])
-    writer.writerow(['Username', user.username])
-    writer.writerow(['Display Name', user.display_name])
-    writer.writerow(['First Name', user.first_name])
-    writer.writerow(['Last Name', user.last_name])
-    writer.writerow(['Preferred Currency', user.preferred_currency])
-    writer.writerow(['Preferred Distance Unit', user.preferred_distance_unit])
-    writer.writerow(['Preferred Volume Unit', user.preferred_volume_unit])
-    writer.writerow(['Timezone', user.timezone])
-    writer.writerow(['Date Joined', user.date_joined])
-    writer.writerow(['Last Login', user.last_login])
-    writer.writerow([])
+    def flush():
+        data = output.getvalue()
+        output.seek(0)
+        output.truncate()
+        return data
     
-    # Section 2: Vehicles
-    writer.writerow(['=== VEHICLES ==='])
-    vehicles = user.vehicles.all()
-    if vehicles.exists():
-        writer.writerow(['ID', 'Name', 'Make', 'Model', 'Year', 'Fuel Type', 'Is Active', 'Created At', 'Updated At'])
-        for vehicle in vehicles:
-            writer.writerow([
+    def rows():
+        # Section 1: User profile
+        writer.writerow(['=== USER PROFILE ==='])
+        writer.writerow(['Field', 'Value'])
+        writer.writerow(['ID', user.id])
+        writer.writerow(['email', user.email])
+        writer.writerow(['Username', user.username])
+        writer.writerow(['Display Name', user.display_name])
+        writer.writerow(['First Name', user.first_name])
+        writer.writerow(['Last Name', user.last_name])
+        writer.writerow(['Preferred Currency', user.preferred_currency])
+        writer.writerow(['Preferred Distance Unit', user.preferred_distance_unit])
+        writer.writerow(['Preferred Volume Unit', user.preferred_volume_unit])
+        writer.writerow(['Timezone', user.timezone])
+        writer.writerow(['Date Joined', user.date_joined])
+        writer.writerow(['Last Login', user.last_login])
+        writer.writerow([])
+        
+        # Section 2: Vehicles
+        writer.writerow(['=== VEHICLES ==='])
+        # Header is written with the first row, so no separate exists() query
+        vehicles = user.vehicles.only(*VEHICLE_EXPORT_FIELDS)
+        batch = []
+        for vehicle in vehicles.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            if not batch:
+                writer.writerow(['ID', 'Name', 'Make', 'Model', 'Year', 'Fuel Type', 'Is Active', 'Created At', 'Updated At'])
+            batch.append([
                 vehicle.id,
                 vehicle.name,
                 vehicle.make,
@@ -268,21 +331,26 @@ def export_user_data(request):
                 vehicle.created_at,
                 vehicle.updated_at
             ])
-    else:
-        writer.writerow(['No vehicles'])
-    writer.writerow([])
-    
-    # Section 3: Fuel entries
-    writer.writerow(['=== FUEL ENTRIES ==='])
-    fuel_entries = user.fuel_entries.select_related('vehicle').order_by('-entry_date')
-    if fuel_entries.exists():
-        writer.writerow([
-            'ID', 'Vehicle Name', 'Date', 'Odometer (km)', 'Station', 'Brand', 'Grade',
-            'Liters', 'Total Amount', 'Unit Price', 'Distance Since Last (km)',
-            'Consumption (L/100km)', 'Cost per km', 'Notes', 'Created At', 'Updated At'
-        ])
-        for entry in fuel_entries:
-            writer.writerow([
+        if batch:
+            writer.writerows(batch)
+        else:
+            writer.writerow(['No vehicles'])
+        writer.writerow([])
+        
+        # Section 3: Fuel entries
+        writer.writerow(['=== FUEL ENTRIES ==='])
+        fuel_entries = user.fuel_entries.select_related('vehicle').only(*FUEL_EXPORT_FIELDS).order_by('-entry_date')
+        wrote_any = False
+        batch = []
+        for entry in fuel_entries.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            if not wrote_any:
+                writer.writerow([
+                    'ID', 'Vehicle Name', 'Date', 'Odometer (km)', 'Station', 'Brand', 'Grade',
+                    'Liters', 'Total Amount', 'Unit Price', 'Distance Since Last (km)',
+                    'Consumption (L/100km)', 'Cost per km', 'Notes', 'Created At', 'Updated At'
+                ])
+                wrote_any = True
+            batch.append([
                 entry.id,
                 entry.vehicle.name,
                 entry.entry_date,
@@ -300,18 +368,20 @@ def export_user_data(request):
                 entry.created_at,
                 entry.updated_at
             ])
-    else:
-        writer.writerow(['No fuel entries'])
-    
-    # Prepare response
-    csv_data = output.getvalue()
-    output.close()
+            if len(batch) >= EXPORT_CHUNK_SIZE:
+                writer.writerows(batch)
+                batch.clear()
+                yield flush()
+        writer.writerows(batch)
+        if not wrote_any:
+            writer.writerow(['No fuel entries'])
+        yield flush()
+        
+        logger.info("Data export completed for user %s", user.id)
     
-    response = HttpResponse(csv_data, content_type='text/csv; charset=utf-8')
+    response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
     response['Content-Disposition'] = f'attachment; filename="fuel_tracker_export_{user.id}.csv"'
     
-    logger.info(f"Data export completed for user {user.id}")
-    
     return response
 
 
@@ -344,21 +414,20 @@ def delete_user_account(request):
     user_id = user.id
     user_email = user.email
     
-    logger.warning(f"User {user_id} ({user_email}) requested account deletion")
-    
-    # Count what will be deleted (for logs)
-    vehicles_count = user.vehicles.count()
-    fuel_entries_count = user.fuel_entries.count()
+    logger.warning("User %s (%s) requested account deletion", user_id, user_email)
     
-    # Delete user (cascade deletion will remove vehicles and fuel_entries)
-    user.delete()
+    # Delete user (cascade deletion will remove vehicles and fuel_entries),
+    # delete() returns per-model row counts for the log, no separate count() needed
+    _, deleted_per_model = user.delete()
+    vehicles_count = deleted_per_model.get('api.Vehicle', 0)
+    fuel_entries_count = deleted_per_model.get('api.FuelEntry', 0)
     
     # Terminate session
     logout(request)
     
     logger.warning(
-        f"Account deleted: user_id={user_id}, email={user_email}, "
-        f"vehicles={vehicles_count}, fuel_entries={fuel_entries_count}"
+        "Account deleted: user_id=%s, email=%s, vehicles=%d, fuel_entries=%d",
+        user_id, user_email, vehicles_count, fuel_entries_count
     )
     
     return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file